@@ -6,8 +6,12 @@ distances and angles between particles (spheres and rods) and for
 aggregating those measurements into histogram distributions used in
 ensemble‑level analysis.
 """
+import math
 import numpy as np
 
+# approximate number of particle pairs evaluated per vectorized block
+PAIR_BLOCK = 1 << 16
+
 class Calculator:
     """
     Collection of static geometry utilities.
@@ -17,6 +21,11 @@ class Calculator:
     calculate_center_distance(new_center, old_center)
         Distance between two centers: point–point, point–segment, or
         segment–segment depending on array dimensionality.
+    distance_kernel(shape1, shape2)
+        Distance function for a pair of body shapes, resolved without
+        inspecting array dimensions.
+    point_point_distance(p, q)
+        Euclidean distance between two points.
     point_to_segment_distance(point, segment)
         Shortest distance between a point and a line segment.
     segment_to_segment_distance(seg1, seg2)
@@ -24,6 +33,8 @@ class Calculator:
     calculate_center_angle(sphere_center, rod_center)
         Angle (degrees) between the rod axis and the sphere–closest‑end
         vector.
+    center_distance_histogram(sphere_xyz, rod_ends, hi, nbins)
+        Histogram the center distances of every body pair.
     evaluate_distribution(ensemble)
         Build histograms of angles / distances for all sphere–rod,
         sphere–sphere, and rod–rod pairs present in an ensemble.
@@ -45,10 +56,15 @@ class Calculator:
         float
             Euclidean distance (point–point), point–segment distance, or
             segment–segment distance as appropriate.
+
+        Notes
+        -----
+        Callers that know the body shapes should use
+        :meth:`distance_kernel` instead and skip the shape inspection.
         """
         
         if new_center.ndim == 1 and old_center.ndim == 1:
-            return np.linalg.norm(new_center - old_center)
+            return Calculator.point_point_distance(new_center, old_center)
 
         # sphere–rod
         if new_center.ndim == 1 and old_center.shape == (2,3):
@@ -60,6 +76,59 @@ class Calculator:
         if new_center.shape == (2,3) and old_center.shape == (2,3):
             return Calculator.segment_to_segment_distance(new_center, old_center)
 
+    @staticmethod
+    def distance_kernel(shape1, shape2):
+        """
+        Distance function for a pair of body shapes.
+
+        Parameters
+        ----------
+        shape1, shape2 : {"sphere", "rod"}
+            Shapes of the first and second body.
+
+        Returns
+        -------
+        callable
+            ``f(center1, center2) -> float`` taking the two body centers
+            in the given order.
+        """
+        return _DISTANCE_KERNELS[shape1, shape2]
+
+    @staticmethod
+    def point_point_distance(p, q):
+        """
+        Euclidean distance between two points.
+
+        Parameters
+        ----------
+        p, q : numpy.ndarray, shape (3,)
+
+        Returns
+        -------
+        float
+        """
+        (x1, y1, z1), (x2, y2, z2) = p.tolist(), q.tolist()
+        return math.sqrt((x1 - x2)**2 + (y1 - y2)**2 + (z1 - z2)**2)
+
+    @staticmethod
+    def sqdist(p, q):
+        """
+        Squared Euclidean distance between two points.
+
+        Collision tests compare it against the squared threshold, which
+        avoids the square root of :meth:`point_point_distance`.
+
+        Parameters
+        ----------
+        p, q : numpy.ndarray, shape (3,)
+
+        Returns
+        -------
+        float
+        """
+        (x1, y1, z1), (x2, y2, z2) = p.tolist(), q.tolist()
+        return (x1 - x2)**2 + (y1 - y2)**2 + (z1 - z2)**2
+
     @staticmethod
     def point_to_segment_distance(point, segment):
         """
@@ -78,13 +147,13 @@ class Calculator:
             Euclidean distance from the point to the closest location on
             the segment.
         """
-        p1, p2 = segment
-        d = p2 - p1
-        a = point - p1
-        t = np.dot(a, d) / np.dot(d, d)
-        t = np.clip(t, 0, 1)
-        closest = p1 + t * d
-        return np.linalg.norm(point - closest)
+        (px, py, pz) = point.tolist()
+        (p1x, p1y, p1z), (p2x, p2y, p2z) = segment.tolist()
+        dx, dy, dz = p2x - p1x, p2y - p1y, p2z - p1z
+        ax, ay, az = px - p1x, py - p1y, pz - p1z
+        dd = dx * dx + dy * dy + dz * dz
+        t = max(0.0, min(1.0, (ax * dx + ay * dy + az * dz) / dd)) if dd else 0.0
+        return math.sqrt((ax - t * dx)**2 + (ay - t * dy)**2 + (az - t * dz)**2)
 
     @staticmethod
     def segment_to_segment_distance(seg1, seg2):
@@ -102,34 +171,35 @@ class Calculator:
             Distance between the closest pair of points, one on each
             segment.
         """
-        p1, p2 = seg1
-        q1, q2 = seg2
+        (p1x, p1y, p1z), (p2x, p2y, p2z) = seg1.tolist()
+        (q1x, q1y, q1z), (q2x, q2y, q2z) = seg2.tolist()
 
-        u = p2 - p1
-        v = q2 - q1
-        w0 = p1 - q1
+        ux, uy, uz = p2x - p1x, p2y - p1y, p2z - p1z
+        vx, vy, vz = q2x - q1x, q2y - q1y, q2z - q1z
+        wx, wy, wz = p1x - q1x, p1y - q1y, p1z - q1z
 
-        a = np.dot(u, u)
-        b = np.dot(u, v)
-        c = np.dot(v, v)
-        d = np.dot(u, w0)
-        e = np.dot(v, w0)
+        a = ux * ux + uy * uy + uz * uz
+        b = ux * vx + uy * vy + uz * vz
+        c = vx * vx + vy * vy + vz * vz
+        d = ux * wx + uy * wy + uz * wz
+        e = vx * wx + vy * wy + vz * wz
 
         denom = a * c - b * b
         if denom == 0:
-            sc = 0
-            tc = np.dot(v, w0) / c if c != 0 else 0
+            sc = 0.0
+            tc = e / c if c != 0 else 0.0
         else:
             sc = (b * e - c * d) / denom
             tc = (a * e - b * d) / denom
 
-        sc = np.clip(sc, 0, 1)
-        tc = np.clip(tc, 0, 1)
-
-        point_on_seg1 = p1 + sc * u
-        point_on_seg2 = q1 + tc * v
+        sc = max(0.0, min(1.0, sc))
+        tc = max(0.0, min(1.0, tc))
 
-        return np.linalg.norm(point_on_seg1 - point_on_seg2)
+        return math.sqrt(
+            (wx + sc * ux - tc * vx)**2
+            + (wy + sc * uy - tc * vy)**2
+            + (wz + sc * uz - tc * vz)**2
+        )
 
     @staticmethod
     def calculate_center_angle(sphere_center, rod_center):
@@ -148,19 +218,226 @@ class Calculator:
         float
             Absolute angle in degrees.
         """
-        if np.linalg.norm(sphere_center - rod_center[0]) > np.linalg.norm(
-            sphere_center - rod_center[1]
-        ):
-            d = rod_center[0] - rod_center[1]
-            a = rod_center[1] - sphere_center
+        (sx, sy, sz) = sphere_center.tolist()
+        (r0x, r0y, r0z), (r1x, r1y, r1z) = rod_center.tolist()
+        dist0 = (sx - r0x)**2 + (sy - r0y)**2 + (sz - r0z)**2
+        dist1 = (sx - r1x)**2 + (sy - r1y)**2 + (sz - r1z)**2
+        if dist0 > dist1:
+            dx, dy, dz = r0x - r1x, r0y - r1y, r0z - r1z
+            ax, ay, az = r1x - sx, r1y - sy, r1z - sz
         else:
-            d = rod_center[1] - rod_center[0]
-            a = rod_center[0] - sphere_center
+            dx, dy, dz = r1x - r0x, r1y - r0y, r1z - r0z
+            ax, ay, az = r0x - sx, r0y - sy, r0z - sz
+
+        norms = math.sqrt((ax * ax + ay * ay + az * az) * (dx * dx + dy * dy + dz * dz))
+        if norms == 0:
+            return math.nan
+        cos_angle = (ax * dx + ay * dy + az * dz) / norms
+        return abs(math.degrees(math.acos(max(-1.0, min(1.0, cos_angle)))))
+
+    @staticmethod
+    def _sphere_rod_pairs(points, p1, d, dd):
+        """
+        Angles and distances for every (rod, sphere) pair in one pass.
+
+        Vectorized counterpart of :meth:`calculate_center_angle` and
+        :meth:`point_to_segment_distance`. Both quantities are derived
+        from the same dot products, which are formed as ``(M, N)``
+        matrix products.
+
+        Parameters
+        ----------
+        points : numpy.ndarray, shape (N, 3)
+            Sphere centers.
+        p1 : numpy.ndarray, shape (M, 3)
+            First endpoint of each rod.
+        d : numpy.ndarray, shape (M, 3)
+            Rod axis vectors ``p2 - p1``.
+        dd : numpy.ndarray, shape (M,)
+            Squared axis lengths ``d·d``.
+
+        Returns
+        -------
+        tuple(numpy.ndarray, numpy.ndarray)
+            Absolute angles in degrees and point–segment distances, both
+            of shape ``(M, N)``.
+        """
+        dd = dd[:, None]
+        inv_dd = 1 / dd
+        # ad = (p - p1)·d and aa0/aa1 = |p - p1|^2, |p - p2|^2
+        ad = d @ points.T - np.einsum("mk,mk->m", d, p1)[:, None]
+        aa0 = (
+            np.einsum("nk,nk->n", points, points)[None, :]
+            + np.einsum("mk,mk->m", p1, p1)[:, None]
+            - 2 * (p1 @ points.T)
+        )
+        aa1 = aa0 - 2 * ad + dd
+
+        t = np.clip(ad * inv_dd, 0, 1)
+        dist = np.sqrt(np.maximum(aa0 - 2 * t * ad + t * t * dd, 0))
+
+        # axis pointing away from the nearest end vs. vector sphere -> that end;
+        # the end is chosen from squared distances, no sqrt or branching needed
+        far0 = aa0 > aa1
+        cos_angle = np.where(far0, ad - dd, -ad) / np.sqrt(np.minimum(aa0, aa1) * dd)
+        # the expansion can land just past +-1 for nearly collinear pairs;
+        # clip like the scalar path (a zero norm still gives NaN)
+        angle = np.abs(np.rad2deg(np.arccos(np.clip(cos_angle, -1.0, 1.0))))
+        return angle, dist
+
+    @staticmethod
+    def _paired_segment_segment(p1, u, a, q1, v, c):
+        """
+        Segment–segment distances for matched pairs of segments.
 
-        cos_angle = np.dot(a, d) / (np.linalg.norm(a) * np.linalg.norm(d))
+        Vectorized counterpart of :meth:`segment_to_segment_distance`
+        applied row by row, so segment ``k`` of the first set is compared
+        with segment ``k`` of the second.
 
-        # Distance from the point to the closest point on the segment
-        return np.abs(np.rad2deg(np.arccos(cos_angle)))
+        Parameters
+        ----------
+        p1, q1 : numpy.ndarray, shape (K, 3)
+            First endpoint of each segment.
+        u, v : numpy.ndarray, shape (K, 3)
+            Segment direction vectors.
+        a, c : numpy.ndarray, shape (K,)
+            Squared segment lengths ``u·u`` and ``v·v``.
+
+        Returns
+        -------
+        numpy.ndarray, shape (K,)
+            Distance between the closest pair of points for each pair.
+        """
+        w0 = p1 - q1
+
+        b = np.einsum("ik,ik->i", u, v)
+        d = np.einsum("ik,ik->i", u, w0)
+        e = np.einsum("ik,ik->i", v, w0)
+        ww = np.einsum("ik,ik->i", w0, w0)
+
+        denom = a * c - b * b
+        parallel = denom == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sc = np.where(parallel, 0, (b * e - c * d) / denom)
+            tc = np.where(
+                parallel,
+                np.where(c != 0, e / c, 0),
+                (a * e - b * d) / denom,
+            )
+
+        sc = np.clip(sc, 0, 1)
+        tc = np.clip(tc, 0, 1)
+
+        # |w0 + sc u - tc v|^2 expanded in terms of the dot products above
+        dist2 = ww + sc * sc * a + tc * tc * c + 2 * (sc * d - tc * e - sc * tc * b)
+        return np.sqrt(np.maximum(dist2, 0))
+
+    @staticmethod
+    def _uniform_hist(values, lo, hi, nbins):
+        """
+        Equal‑width histogram computed with ``np.bincount``.
+
+        Gives the same counts and edges as
+        ``np.histogram(values, range=(lo, hi), bins=nbins)`` without the
+        generic bin‑edge handling.
+
+        Parameters
+        ----------
+        values : array_like
+            Samples to bin; flattened before use.
+        lo, hi : float
+            Inclusive histogram range.
+        nbins : int
+            Number of equal‑width bins.
+
+        Returns
+        -------
+        tuple(numpy.ndarray, numpy.ndarray)
+            Bin counts of shape ``(nbins,)`` and edges of shape
+            ``(nbins + 1,)``.
+        """
+        edges = np.linspace(lo, hi, nbins + 1)
+        values = np.ravel(values)
+        values = values[(values >= lo) & (values <= hi)]
+        idx = ((values - lo) * (nbins / (hi - lo))).astype(np.intp)
+        idx[idx == nbins] -= 1
+        # values rounding across an edge are moved to the bin np.histogram uses
+        idx[values < edges[idx]] -= 1
+        idx[(values >= edges[idx + 1]) & (idx != nbins - 1)] += 1
+        return np.bincount(idx, minlength=nbins), edges
+
+    @staticmethod
+    def _upper_pairs(n):
+        """
+        Yield the strict upper‑triangle index pairs of an ``n × n`` grid.
+
+        Pairs are produced in row blocks holding roughly ``PAIR_BLOCK``
+        pairs each, so callers can reduce them without materializing all
+        ``n (n - 1) / 2`` pairs at once.
+
+        Parameters
+        ----------
+        n : int
+            Number of items.
+
+        Yields
+        ------
+        tuple(numpy.ndarray, numpy.ndarray)
+            Row and column indices ``(i, j)`` with ``i < j``.
+        """
+        cols = np.arange(n)
+        step = max(1, PAIR_BLOCK // max(n, 1))
+        for start in range(0, n, step):
+            rows = cols[start:start + step]
+            i, j = np.nonzero(rows[:, None] < cols[None, :])
+            yield rows[i], j
+
+    @staticmethod
+    def center_distance_histogram(sphere_xyz, rod_ends, hi, nbins):
+        """
+        Histogram the center distances of every body pair.
+
+        Distances follow :meth:`calculate_center_distance` (point–point,
+        point–segment or segment–segment by shape) but are evaluated in
+        vectorized blocks rather than pair by pair.
+
+        Parameters
+        ----------
+        sphere_xyz : numpy.ndarray, shape (N, 3)
+            Sphere centers.
+        rod_ends : numpy.ndarray, shape (M, 2, 3)
+            Rod segment endpoints.
+        hi : float
+            Upper edge of the histogram; the lower edge is 0.
+        nbins : int
+            Number of equal‑width bins. Distances ``>= hi`` are dropped.
+
+        Returns
+        -------
+        numpy.ndarray, shape (nbins,)
+            Pair counts per bin (float).
+        """
+        step = hi / nbins
+        counts = np.zeros(nbins, dtype=np.intp)
+
+        def add(dist):
+            idx = np.floor(dist / step).astype(np.intp)
+            counts[:] += np.bincount(idx[idx < nbins], minlength=nbins)
+
+        rod_p1 = rod_ends[:, 0]
+        rod_dir = rod_ends[:, 1] - rod_p1
+        rod_dd = np.einsum("mk,mk->m", rod_dir, rod_dir)
+
+        block = max(1, PAIR_BLOCK // max(len(rod_ends), 1))
+        for start in range(0, len(sphere_xyz), block):
+            add(Calculator._sphere_rod_pairs(sphere_xyz[start:start + block], rod_p1, rod_dir, rod_dd)[1])
+        for i, j in Calculator._upper_pairs(len(sphere_xyz)):
+            add(np.linalg.norm(sphere_xyz[i] - sphere_xyz[j], axis=1))
+        for i, j in Calculator._upper_pairs(len(rod_ends)):
+            add(Calculator._paired_segment_segment(
+                rod_p1[i], rod_dir[i], rod_dd[i], rod_p1[j], rod_dir[j], rod_dd[j]
+            ))
+        return counts.astype(float)
 
     @staticmethod
     def evaluate_distribution(ensemble):
@@ -174,8 +451,9 @@ class Calculator:
 
         Parameters
         ----------
-        ensemble : object
-            Object exposing ``bodies`` (iterable of sphere/rod objects).
+        ensemble : CloudGenerator
+            Ensemble exposing the cached ``spheres_xyz``, ``rod_ends`` and
+            ``mean_sphere_radius`` geometry.
 
         Returns
         -------
@@ -183,53 +461,61 @@ class Calculator:
             Mapping of distribution labels to ``{\"dist\": counts,
             \"bins\": edges}`` dictionaries.
         """
-        rods, spheres = [], []
-        i, j, k, radii = 0, 0, 0, 0
-        for body in ensemble.bodies:
-            center = body.center
-            if body.shape == "sphere":
-                radii += body.radius
-                spheres.append(center)
-            if body.shape == "rod":
-                rods.append(center)
-        radius = radii / len(spheres)
-
-        angle   = np.zeros((len(rods), len(spheres)))       # Initialize as 2D array
-        dist_sr = np.zeros((len(rods), len(spheres)))       # Initialize as 2D array
-        dist_ss = np.zeros((len(spheres), len(spheres)))    # Initialize as 2D array
-        dist_rr = np.zeros((len(rods), len(rods)))          # Initialize as 2D array
-        
-        for j in range(len(spheres)):
-            for i in range(len(rods)):
-                angle[i, j] = Calculator.calculate_center_angle(spheres[j], rods[i])
-                dist_sr[i, j] = Calculator.calculate_center_distance(
-                    spheres[j], rods[i]
-                )
-
-            for k in range(j+1, len(spheres)):
-                dist_ss[k, j] = Calculator.calculate_center_distance(
-                    spheres[j], spheres[k]
-                    )
-        # csv formatting
-        for i in range(len(rods)):
-            for j in range(i+1, len(rods)):
-                dist_rr[i, j] = Calculator.calculate_center_distance(
-                    rods[i], rods[j]
-                    )
-        if len(spheres) > 0 and len(rods) > 0:
-            angle, angle_bins = np.histogram(angle, range=(0, 180), bins= 36)  # Convert to 2D array
-            dist_sr, dsr_bins = np.histogram(dist_sr, range=(2 * radius, 80 * radius), bins= 78)  # Convert to 2D array
-            dist_ss, dss_bins = np.histogram(dist_ss, range=(2 * radius, 80 * radius), bins= 78)  # Convert to 2D array
-            dist_rr, drr_bins = np.histogram(dist_rr, range=(2 * radius, 80 * radius), bins= 78)  # Convert to 2D array
+        # structure‑of‑arrays center layout, cached on the ensemble
+        sphere_xyz = ensemble.spheres_xyz
+        rod_ends = ensemble.rod_ends
+        radius = ensemble.mean_sphere_radius
+
+        # rod axes and their self‑dots are shared by every sphere–rod and
+        # rod–rod pair, so they are formed once per rod
+        rod_p1 = rod_ends[:, 0]
+        rod_dir = rod_ends[:, 1] - rod_p1
+        rod_dd = np.einsum("mk,mk->m", rod_dir, rod_dir)
+
+        lo, hi = 2 * radius, 80 * radius
+        angle   = np.zeros(36, dtype=np.intp)
+        dist_sr = np.zeros(78, dtype=np.intp)
+        dist_ss = np.zeros(78, dtype=np.intp)
+        dist_rr = np.zeros(78, dtype=np.intp)
+
+        # pairs are streamed in blocks of ~PAIR_BLOCK straight into the
+        # histograms so no full (rods, spheres) or self‑pair array is built
+        step = max(1, PAIR_BLOCK // max(len(rod_ends), 1))
+        for start in range(0, len(sphere_xyz), step):
+            block_angle, block_dist = Calculator._sphere_rod_pairs(
+                sphere_xyz[start:start + step], rod_p1, rod_dir, rod_dd
+            )
+            angle += Calculator._uniform_hist(block_angle, 0, 180, 36)[0]
+            dist_sr += Calculator._uniform_hist(block_dist, lo, hi, 78)[0]
+
+        for i, j in Calculator._upper_pairs(len(sphere_xyz)):
+            block_dist = np.linalg.norm(sphere_xyz[i] - sphere_xyz[j], axis=1)
+            dist_ss += Calculator._uniform_hist(block_dist, lo, hi, 78)[0]
+
+        for i, j in Calculator._upper_pairs(len(rod_ends)):
+            block_dist = Calculator._paired_segment_segment(
+                rod_p1[i], rod_dir[i], rod_dd[i], rod_p1[j], rod_dir[j], rod_dd[j]
+            )
+            dist_rr += Calculator._uniform_hist(block_dist, lo, hi, 78)[0]
+
+        angle_bins = np.linspace(0, 180, 37)
+        dist_bins = np.linspace(lo, hi, 79)
+        if len(sphere_xyz) > 0 and len(rod_ends) > 0:
             bins = {"angle": {"dist": angle, "bins": angle_bins}, 
-                    "dist_sr": {"dist": dist_sr, "bins": dsr_bins},
-                    "dist_ss": {"dist": dist_ss, "bins": dss_bins},
-                    "dist_rr": {"dist": dist_rr, "bins": drr_bins}}
-        elif len(spheres) > 0:
-            dist_ss, dss_bins = np.histogram(dist_ss, range=(2* radius, 80 * radius), bins= 78)  # Convert to 2D array
-            bins = {"dist_ss": {"dist": dist_ss, "bins": dss_bins}}
-        elif len(rods) > 0:
-            dist_rr, drr_bins = np.histogram(dist_rr, range=(2 * radius, 80 * radius), bins= 78)  # Convert to 2D array
-            bins = {"dist_rr": {"dist": dist_rr, "bins": drr_bins}}            
+                    "dist_sr": {"dist": dist_sr, "bins": dist_bins},
+                    "dist_ss": {"dist": dist_ss, "bins": dist_bins},
+                    "dist_rr": {"dist": dist_rr, "bins": dist_bins}}
+        elif len(sphere_xyz) > 0:
+            bins = {"dist_ss": {"dist": dist_ss, "bins": dist_bins}}
+        elif len(rod_ends) > 0:
+            bins = {"dist_rr": {"dist": dist_rr, "bins": dist_bins}}
         return bins
 
+
+# distance function per (shape, shape) pair; arguments are the two centers in order
+_DISTANCE_KERNELS = {
+    ("sphere", "sphere"): Calculator.point_point_distance,
+    ("sphere", "rod"): Calculator.point_to_segment_distance,
+    ("rod", "sphere"): lambda segment, point: Calculator.point_to_segment_distance(point, segment),
+    ("rod", "rod"): Calculator.segment_to_segment_distance,
+}
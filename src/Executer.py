@@ -10,9 +10,28 @@ Executer
 """
 
 import os, subprocess
-from shutil import copytree
+from functools import lru_cache
 import numpy as np
-from PyQt5.QtCore import QSettings
+from discretization import discretize_all
+import settings_cache
+
+# OpenMP threads used by each solver process
+OMP_THREADS = 16
+
+# solver environment, copied from os.environ once and shared by every run
+OMP_ENV = {**os.environ, "OMP_NUM_THREADS": str(OMP_THREADS)}
+
+
+@lru_cache(maxsize=None)
+def _read_template(path, mtime):
+    """Read a parameter template; ``mtime`` is part of the key so edits are picked up."""
+    with open(path) as f:
+        return f.read()
+
+
+def _template(path):
+    """Text of the ``ddscat.par`` template at ``path``, read from disk once per change."""
+    return _read_template(path, os.path.getmtime(path))
 
 
 class Executer:
@@ -29,124 +48,81 @@ class Executer:
         Illumination wavelength in nanometers.
     target : str, optional
         Output directory into which DDSCAT input/output files are written.
-        Defaults to ``<outputDir>/ensembles/<ensemble_id>`` from ``QSettings``.
+        Defaults to ``<outputDir>/ensembles/<ensemble_id>`` from the settings.
+
+    Attributes
+    ----------
+    paths : dict[str, str]
+        ``outputDir``, ``DDSCATDir`` and ``materialDir`` resolved once at
+        construction from :mod:`settings_cache`.
     """
     def __init__(self, ensemble, wavelength = 800, target=None):
-        """Store configuration and prepare an environment with OMP threads."""
+        """Resolve configured paths and prepare an environment with OMP threads."""
         self.ensemble = ensemble
-        self.settings = QSettings("LogicLorenzo", "PTTool")
+        self.paths = settings_cache.all_paths()
         self.wavelength = wavelength / 1000
         if target is None:
-            target = os.path.join(self.settings.value("outputDir"), "ensembles", self.ensemble.ensemble_id)
+            target = os.path.join(self.paths["outputDir"], "ensembles", self.ensemble.ensemble_id)
         self.target = target
-
-        env = os.environ.copy()
-        env["OMP_NUM_THREADS"] = "16"
-        self.env = env
+        self.env = OMP_ENV
 
     
     def run_ddscat(self, make_baseline=False):
         """
         Construct DDSCAT shape/material files and execute the solver.
 
-        Generates ``shape.dat``, reads template parameter files, formats 
-        ``ddscat.par`` template placeholders with ensemble‑specific values 
+        Generates ``shape.dat`` and writes ``ddscat.par`` by formatting the
+        cached parameter template with ensemble‑specific values 
         (effective radius, material paths, etc.). All integer dipole lattice 
         coordinates are appended to ``shape.dat`` after computing per‑body
-        discretizations.
+        discretizations. Blocks until the solver exits; the GUI runs the
+        same commands through ``QProcess`` instead (see
+        :meth:`ddscat_command`).
 
         If ``make_baseline`` is ``True`` a second “baseline” run is
-        created in a sibling directory containing only spherical bodies.
+        created in a sibling directory containing only spherical bodies
+        and executed after the main run.
 
         Parameters
         ----------
         make_baseline : bool, default=False
             Whether to execute an additional baseline DDSCAT run using
             only the spherical subset of bodies.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            If a solver run exits with a non‑zero code.
         """
         
-        def make_files(bodies, target, baseline=False):
-            if baseline:
-                temp_path = os.path.join(self.settings.value("DDSCATDir"), "temp_file", "baseline.par")
-                with open(temp_path, "r+") as f:
-                    content = f.read()
-
-                with open(f"{target}/ddscat.par", "r+") as f:
-                    modified_content = content.format(
-                        mat=os.path.join(self.settings.value("materialDir"), self.ensemble.materials["plasmonic"]),
-                        wav=self.wavelength,
-                        eff_rad=round(((3 * total_vol / (4 * np.pi)) ** (1/3))*self.ensemble.dipole_size/10**3, 4))
-                    f.seek(0)  # Move the file pointer to the beginning of the file
-                    f.write(modified_content)
-                    f.truncate()  # Ensure the file is truncated to the new size
-            else: 
-                temp_path = os.path.join(self.settings.value("DDSCATDir"), "temp_file", "mixture.par")
-                with open(temp_path, "r+") as f:
-                    content = f.read()
-
-                with open(f"{target}/ddscat.par", "r+") as f:
-                    modified_content = content.format(
-                        mat1=os.path.join(self.settings.value("materialDir"), self.ensemble.materials["plasmonic"]),
-                        mat2=os.path.join(self.settings.value("materialDir"), self.ensemble.materials["dielectric"]),
-                        wav=self.wavelength,
-                        eff_rad=round(((3 * total_vol / (4 * np.pi)) ** (1/3))*self.ensemble.dipole_size/10**3, 4))
-                    f.seek(0)  # Move the file pointer to the beginning of the file
-                    f.write(modified_content)
-                    f.truncate()  # Ensure the file is truncated to the new size
-            
-            total_dipoles = 0
-            total_vol = 0
-            pre = [
-            "1.000000  0.000000  0.000000 = A_1 vector\n",
-            "0.000000  1.000000  0.000000 = A_2 vector\n",
-            "1.000000  1.000000  1.000000 = lattice spacings (d_x,d_y,d_z)/d\n",
-            "0.000000  0.000000  0.000000 = lattice offset x0(1-3) = (x_TF,y_TF,z_TF)/d for dipole 0 0 0\n",
-            "JA  IX  IY  IZ ICOMP(x,y,z)\n",
-            ]
-            for body in bodies:
-                total_vol += body.volume
-                
-            with open(f"{target}/shape.dat", "w") as f:
-                f.write(f"{self.ensemble.ensemble_id}\n"),
-                f.write("{total_dipoles} = NAT \n"),
-                f.writelines(pre)    
-        
-            for body in bodies:
-                body_dipoles = body.discretize()
-                num_dipoles = len(body_dipoles)
-                dipole_points = np.hstack(
-                    (
-                        np.array(range(total_dipoles + 1, total_dipoles + num_dipoles + 1)).reshape(num_dipoles, 1).astype(int),
-                        np.around(body_dipoles).astype(int),
-                        np.array([body.material_idx] * 3 * num_dipoles).reshape(num_dipoles, 3).astype(int),
-                    )
-                )
-                with open(f"{target}/shape.dat", "a+") as f:
-                    for line in dipole_points:
-                        f.write(" ".join(map(str, line)) + "\n")
-                total_dipoles += num_dipoles
-                
-            with open(f"{target}/shape.dat", "r+") as f:
-                modified_content = f.read().format(total_dipoles= str(total_dipoles))
-                f.seek(0)  # Move the file pointer to the beginning of the file
-                f.write(modified_content)
-                f.truncate()  # Ensure the file is truncated to the new size
-        
-        os.makedirs(self.target, exist_ok=True)
-        ddscat_path = os.path.join(self.settings.value("DDSCATDir"), "src/ddscat")
-        make_files(self.ensemble.bodies, self.target)
-        subprocess.run([ddscat_path], cwd=self.target, check=False, env=self.env)
+        ddscat_path, args, target = self.ddscat_command()
+        self._run(ddscat_path, args, target)
         if make_baseline:
             baseline_dir = os.path.join(self.target, "_baseline")
             os.makedirs(baseline_dir, exist_ok=True)
-            make_files(
+            self._make_files(
                 [body for body in self.ensemble.bodies if body.material_idx == 1],
                 baseline_dir,
                 baseline=make_baseline
             )
-            subprocess.run([ddscat_path], cwd=self.target, check=False, env=self.env)
-        
-                
+            self._run(ddscat_path, args, baseline_dir)
+
+    def ddscat_command(self):
+        """
+        Write the DDSCAT input files and describe how to start the solver.
+
+        Lets callers run the solver under their own process management
+        (e.g. ``QProcess``) instead of :meth:`run_ddscat`; the process
+        needs :attr:`env` for its OpenMP thread count.
+
+        Returns
+        -------
+        tuple(str, list[str], str)
+            Executable, its arguments and the working directory.
+        """
+        os.makedirs(self.target, exist_ok=True)
+        self._make_files(self.ensemble.bodies, self.target)
+        return os.path.join(self.paths["DDSCATDir"], "src/ddscat"), [], self.target
 
     def run_ddpostprocess(self):
         """
@@ -154,9 +130,26 @@ class Executer:
 
         Produces VTR output (|E| field) by setting ``IVTR=1`` and
         disabling line sampling. The external binary is executed in the
-        ensemble's target directory.
+        ensemble's target directory and the call blocks until it exits.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            If ddpostprocess exits with a non‑zero code.
+        """
+        self._run(*self.ddpostprocess_command())
+
+    def ddpostprocess_command(self):
+        """
+        Write ``ddpostprocess.par`` and describe how to start ddpostprocess.
+
+        The DDSCAT output it reads must already exist.
+
+        Returns
+        -------
+        tuple(str, list[str], str)
+            Executable, its arguments and the working directory.
         """
-        
         preamble = [
         "’w000r000k000.E1’ = name of file with E stored\n",
         "’VTRoutput’ = prefix for name of VTR output files\n",
@@ -166,6 +159,74 @@ class Executer:
         with open(f"{self.target}/ddpostprocess.par", "w") as f:
             f.writelines(preamble)
 
-        ddpost_path = os.path.join(self.settings.value("DDSCATDir"), "src/ddpostprocess")
-        subprocess.run(ddpost_path, cwd=self.target, check=False, env=self.env)
-        
+        return os.path.join(self.paths["DDSCATDir"], "src/ddpostprocess"), [], self.target
+
+    def _make_files(self, bodies, target, baseline=False):
+        """
+        Write ``ddscat.par`` and ``shape.dat`` for ``bodies`` into ``target``.
+
+        Parameters
+        ----------
+        bodies : list
+            Bodies to include in the target.
+        target : str
+            Existing directory receiving the files.
+        baseline : bool, default=False
+            Use the single‑material ``baseline.par`` template.
+        """
+        total_dipoles = 0
+        total_vol = 0
+        pre = [
+        "1.000000  0.000000  0.000000 = A_1 vector\n",
+        "0.000000  1.000000  0.000000 = A_2 vector\n",
+        "1.000000  1.000000  1.000000 = lattice spacings (d_x,d_y,d_z)/d\n",
+        "0.000000  0.000000  0.000000 = lattice offset x0(1-3) = (x_TF,y_TF,z_TF)/d for dipole 0 0 0\n",
+        "JA  IX  IY  IZ ICOMP(x,y,z)\n",
+        ]
+        for body in bodies:
+            total_vol += body.volume
+
+        eff_rad = round(((3 * total_vol / (4 * np.pi)) ** (1/3))*self.ensemble.dipole_size/10**3, 4)
+        if baseline:
+            template = _template(os.path.join(self.paths["DDSCATDir"], "temp_file", "baseline.par"))
+            par = template.format(
+                mat=os.path.join(self.paths["materialDir"], self.ensemble.materials["plasmonic"]),
+                wav=self.wavelength,
+                eff_rad=eff_rad)
+        else:
+            template = _template(os.path.join(self.paths["DDSCATDir"], "temp_file", "mixture.par"))
+            par = template.format(
+                mat1=os.path.join(self.paths["materialDir"], self.ensemble.materials["plasmonic"]),
+                mat2=os.path.join(self.paths["materialDir"], self.ensemble.materials["dielectric"]),
+                wav=self.wavelength,
+                eff_rad=eff_rad)
+        with open(f"{target}/ddscat.par", "w") as f:
+            f.write(par)
+
+        # bodies already discretized (when stored, or loaded from the
+        # database) keep their cached lattice
+        discretize_all(bodies)
+
+        dipole_blocks = []
+        for body in bodies:
+            body_dipoles = body.dipoles
+            num_dipoles = len(body_dipoles)
+            # JA, IX, IY, IZ, ICOMP(x,y,z)
+            dipole_points = np.empty((num_dipoles, 7), dtype=np.int32)
+            dipole_points[:, 0] = np.arange(total_dipoles + 1, total_dipoles + num_dipoles + 1)
+            dipole_points[:, 1:4] = body_dipoles
+            dipole_points[:, 4:] = body.material_idx
+            dipole_blocks.append(dipole_points)
+            total_dipoles += num_dipoles
+
+        with open(f"{target}/shape.dat", "w") as f:
+            f.write(f"{self.ensemble.ensemble_id}\n")
+            f.write(f"{total_dipoles} = NAT \n")
+            f.writelines(pre)
+            # format each block in one C-level pass instead of row by row
+            for block in dipole_blocks:
+                f.write(("%d %d %d %d %d %d %d\n" * len(block)) % tuple(block.ravel().tolist()))
+
+    def _run(self, executable, args, cwd):
+        """Run an external binary to completion, raising on failure."""
+        subprocess.run([executable, *args], cwd=cwd, env=self.env, check=True)
@@ -24,14 +24,25 @@ class Runner:
     ensemble : object
         In‑memory ensemble object exposing ``ensemble_id`` and geometry
         required by :meth:`Calculator.evaluate_distribution`.
+    storer : Storer, optional
+        Open storer used to flag completion; a new one is created when
+        omitted.
+    target : str or os.PathLike, optional
+        Directory receiving the CSV files. Defaults to
+        ``<outputDir>/ensembles/<ensemble_id>`` from the settings.
     """
-    def __init__(self, ensemble):
+    def __init__(self, ensemble, storer=None, target=None):
         """Store collaborators used throughout the run."""
         self.ensemble = ensemble
-        self.storer = Storer()
+        self.storer = storer if storer is not None else Storer()
         self.calculator = Calculator()
+        if target is None:
+            # imported here so the runner itself does not need Qt
+            import settings_cache
+            target = os.path.join(settings_cache.get("outputDir"), "ensembles", ensemble.ensemble_id)
+        self.target = target
 
-    def generate_ensemble_data(self):
+    def generate_ensemble_data(self, flag=True, distributions=None):
         """
         Compute and persist all histogram distributions for the ensemble.
 
@@ -39,11 +50,24 @@ class Runner:
         mapping of labels to histogram data structures and writes each one
         to CSV via :meth:`write_to_csv`. Finally marks the ensemble's
         ``ensemble_data`` flag as complete in the database.
+
+        Parameters
+        ----------
+        flag : bool, default=True
+            Set the ``ensemble_data`` flag. Callers batching their flag
+            writes with :meth:`Storer.mark_done` pass ``False``.
+        distributions : dict, optional
+            Result of :meth:`Calculator.evaluate_distribution` already
+            computed elsewhere (e.g. in a worker process); evaluated here
+            when omitted.
         """
-        ensemble_dist = self.calculator.evaluate_distribution(self.ensemble)
+        ensemble_dist = distributions
+        if ensemble_dist is None:
+            ensemble_dist = self.calculator.evaluate_distribution(self.ensemble)
         for keys in ensemble_dist.keys():
             self.write_to_csv(ensemble_dist[keys], keys)
-        self.storer.update_ensembe_info(self.ensemble.ensemble_id, "ensemble_data")
+        if flag:
+            self.storer.update_ensembe_info(self.ensemble.ensemble_id, "ensemble_data")
 
     def write_to_csv(self, data, label):
         """
@@ -63,10 +87,11 @@ class Runner:
         """
         if len(data) == 0:
             return
-        filename = os.path.join(self.paths["outputDir"], "ensembles", self.ensemble.ensemble_id, f"{label}_dist.csv")
-        with open(filename, 'w+', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            data_edit = [data["dist"], data["bins"][:-1], data["bins"][1:]]
-            for row in data_edit:
-                writer.writerow(row)
+        filename = os.path.join(self.target, f"{label}_dist.csv")
+        # each row converted to Python numbers in one call and written with
+        # one writerows; counts stay integers and edges keep their shortest
+        # repr, exactly as when the numpy values were written cell by cell
+        rows = [data["dist"].tolist(), data["bins"][:-1].tolist(), data["bins"][1:].tolist()]
+        with open(filename, "w", newline="") as csvfile:
+            csv.writer(csvfile).writerows(rows)
                
\ No newline at end of file
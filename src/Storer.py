@@ -3,27 +3,99 @@ Persistent storage utilities for ensemble simulations.
 
 This module defines the :class:`Storer` class, which manages creation and
 updates of a lightweight SQLite schema for ensembles, their constituent
-particles, and scattering results. A small shelve database is used to
-generate unique ensemble identifiers.
+particles, and scattering results. Allocated ensemble identifiers are
+recorded in the same database so they are never reused.
 
 Tables
 ------
 ensembles
     One row per generated ensemble and high‑level metadata/flags.
 ensemble_particles
-    Per‑particle geometric/physical properties for an ensemble.
+    Per‑particle geometric/physical properties for an ensemble, plus the
+    particle's int32 ``(M, 3)`` dipole lattice as a raw ``dipoles`` BLOB
+    (see :func:`load_dipoles`).
 ensemble_scattering
     Scattering / absorption efficiencies indexed by wavelength and number
     of orientations.
+keys
+    Every identifier handed out by :func:`generate_new_key`.
+
+Apart from ``ensembles`` the tables are ``WITHOUT ROWID``, so rows are
+stored clustered on their composite primary key and per‑ensemble lookups
+read them straight from the key b‑tree.
 
 Functions
 ---------
-generate_new_key(key_db, n_bytes=5)
-    Allocate a new unique hexadecimal identifier and persist it inside a
-    shelve file so keys are never reused across sessions.
+connect_db(path)
+    Open an autocommit connection with the shared WAL / cache pragmas.
+database_path()
+    Location of ``ensembles.db`` inside the configured ``outputDir``.
+shared_connection(path=None)
+    The process‑wide connection to ``ensembles.db`` reused by every
+    :class:`Storer` and :class:`CloudGenerator`.
+load_dipoles(blob)
+    Decode a ``dipoles`` BLOB back into an int32 ``(M, 3)`` array.
+generate_new_key(db, n_bytes=8)
+    Allocate a new unique hexadecimal identifier and record it in the
+    ``keys`` table so keys are never reused across sessions.
 """
 
-import secrets, shelve, sqlite3, os
+import secrets, sqlite3, os
+from functools import lru_cache
+import numpy as np
+from discretization import discretize_all
+
+# per-connection settings; journal_mode=WAL is persistent in the file, the
+# others have to be reissued on every connection (including the Qt ones)
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",     # 64 MB
+    "PRAGMA mmap_size=268435456",   # 256 MB
+)
+
+# completion flags in the ensembles table settable by mark_done
+_FLAG_COLUMNS = frozenset({"ensemble_data", "ddscat_run", "postprocessing_run"})
+
+
+def connect_db(path):
+    """
+    Open ``path`` in autocommit mode and apply the write‑oriented pragmas.
+
+    Transactions are opened explicitly with ``BEGIN`` by the callers.
+    """
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    for pragma in PRAGMAS:
+        db.execute(pragma)
+    return db
+
+def database_path():
+    """Path of ``ensembles.db`` inside the configured ``outputDir``."""
+    # imported here so the storage layer itself does not need Qt
+    import settings_cache
+    return os.path.join(settings_cache.get("outputDir"), "ensembles.db")
+
+
+def shared_connection(path=None):
+    """
+    Return the one connection to ``path`` shared by the whole process.
+
+    Every caller reusing it keeps a single page cache and WAL reader slot
+    instead of each opening (and warming up) its own. It is never closed.
+
+    Parameters
+    ----------
+    path : str, optional
+        Database file; defaults to :func:`database_path`.
+    """
+    return _connection(path or database_path())
+
+
+@lru_cache(maxsize=None)
+def _connection(path):
+    return connect_db(path)
+
 
 class Storer:
     """
@@ -32,25 +104,39 @@ class Storer:
     Parameters
     ----------
     settings : QSettings, optional
-        If provided, can be used to derive on‑disk locations for the
-        shelve file and SQLite database. Currently unused; the class
-        defaults to local filenames ``keys`` and ``ensembles.db``.
+        Used to locate ``ensembles.db`` inside the configured
+        ``outputDir``; defaults to the value in :mod:`settings_cache`.
+        Ignored when ``conn`` is given.
+    conn : sqlite3.Connection, optional
+        Connection to use; defaults to :func:`shared_connection` for the
+        database file.
 
     Attributes
     ----------
-    key_db : str
-        Path/prefix of the shelve file holding allocated keys.
     data_db : str
-        Path to the SQLite database file.
+        Path to the SQLite database file; for an injected ``conn`` the
+        file it has open (empty for an in‑memory database).
+    db : sqlite3.Connection
+        Connection used by the instance. It is shared, not owned:
+        :meth:`close` (or leaving the instance as a context manager) only
+        drops the reference.
     """
 
-    def __init__(self, settings=None):
+    def __init__(self, settings=None, conn=None):
         """Initialize (or migrate) the database schema if not present."""
         
-        self.key_db = os.path.join(settings.value("outputDir"), "keys")
-        self.data_db = os.path.join(settings.value("outputDir"), "ensembles.db")
-        db = sqlite3.connect(self.data_db)
-        c  = db.cursor()
+        if conn is not None:
+            # the file behind the given connection, never the configured one
+            self.data_db = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+            self.db = conn
+        else:
+            if settings is not None:
+                self.data_db = os.path.join(settings.value("outputDir"), "ensembles.db")
+            else:
+                self.data_db = database_path()
+            self.db = shared_connection(self.data_db)
+        c  = self.db.cursor()
+        c.execute("BEGIN")
         c.execute("""CREATE TABLE IF NOT EXISTS ensembles (
         ensemble_id             TEXT        PRIMARY KEY,
         ensemble_type           TEXT        NOT NULL,
@@ -80,9 +166,15 @@ class Storer:
         rx            FLOAT,
         ry            FLOAT,
         rz            FLOAT,
+        dipoles       BLOB,
         PRIMARY KEY (ensemble_id, particle_idx),
         FOREIGN KEY (ensemble_id) REFERENCES ensembles(ensemble_id)
-        ); """)
+        ) WITHOUT ROWID; """)
+
+        # databases created before the dipoles column existed
+        columns = {row[1] for row in c.execute("PRAGMA table_info(ensemble_particles)")}
+        if "dipoles" not in columns:
+            c.execute("ALTER TABLE ensemble_particles ADD COLUMN dipoles BLOB")
 
         c.execute("""CREATE TABLE IF NOT EXISTS ensemble_scattering (
         ensemble_id     TEXT        NOT NULL,
@@ -93,10 +185,31 @@ class Storer:
         abs_enh         FLOAT,
         PRIMARY KEY (ensemble_id, wavelength, num_ori),
         FOREIGN KEY (ensemble_id) REFERENCES ensembles(ensemble_id)
-        );""")     
+        ) WITHOUT ROWID;""")     
+
+        has_keys = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'keys'"
+        ).fetchone() is not None
+        c.execute("""CREATE TABLE IF NOT EXISTS keys (
+        token           TEXT        PRIMARY KEY
+        ) WITHOUT ROWID;""")
+        if not has_keys:
+            # ids allocated before the keys table existed; copied once,
+            # when the table is created
+            c.execute("INSERT OR IGNORE INTO keys (token) SELECT ensemble_id FROM ensembles")
+
+        c.execute("COMMIT")
+        c.close()
+
+    def close(self):
+        """Release the connection; it stays open for its other users."""
+        self.db = None
 
-        db.commit()
-        c.close(), db.close()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def store_new_ensemble(self, ensemble):
         """
@@ -106,6 +219,10 @@ class Storer:
         and then all particle records are bulk‑inserted. Numeric values
         stored in simulation units are converted back to physical units
         using the ensemble's ``dipole_size``.
+        Each particle is discretized (reusing any cached lattice) and its
+        dipoles stored with the row, so later runs can load them instead
+        of recomputing. The lattices are computed in a process pool before
+        the write lock is taken, which is held only for the inserts.
 
         Parameters
         ----------
@@ -122,41 +239,57 @@ class Storer:
         str
             The generated unique ``ensemble_id``.
         """
-        ensemble_id = generate_new_key(self.key_db)
-        ensemble_db = sqlite3.connect(self.data_db)
-        c = ensemble_db.cursor()
-        c.execute("""INSERT INTO ensembles (
-            ensemble_id, ensemble_type, dipole_size, cloud_radius, plasmonic_fv, dielectric_fv, pdi
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                ensemble_id,
-                ensemble.option,
-                ensemble.dipole_size,
-                ensemble.cloud_radius * ensemble.dipole_size,
-                ensemble.particle_data["plasmonic"]["volume_fraction"],
-                ensemble.particle_data["dielectric"]["volume_fraction"],
-                ensemble.polydispersity,
-            )
-        )
-        for idx, particle in enumerate(ensemble.bodies):
-            c.execute("""INSERT INTO ensemble_particles (
-                ensemble_id, particle_idx, material_idx, material, shape, radius, length, volume, cx, cy, cz, rx, ry, rz
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        # the expensive part, done while other connections can still write
+        discretize_all(ensemble.bodies)
+        c = self.db.cursor()
+        # take the write lock up front so the key, the ensemble and its
+        # particles land in a single transaction
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            ensemble_id = generate_new_key(self.db)
+            d = ensemble.dipole_size
+            d3 = d**3
+            bodies = ensemble.bodies
+            # one builder per shape so no row needs hasattr checks; length
+            # and rotation only exist for rods. Values are converted to
+            # native Python numbers so sqlite3 binds them without adapting
+            # numpy scalars cell by cell
+            rows = [
+                (ensemble_id, idx, int(p.material_idx), p.material, "sphere",
+                 float(p.radius * d), None, float(p.volume * d3), *(p.position * d).tolist(), None, None, None,
+                 p.dipoles.tobytes())
+                for idx, p in enumerate(bodies) if p.shape == "sphere"
+            ]
+            rows += [
+                (ensemble_id, idx, int(p.material_idx), p.material, "rod",
+                 float(p.radius * d), float(p.height * d), float(p.volume * d3), *(p.position * d).tolist(),
+                 *p.rotation.tolist(), p.dipoles.tobytes())
+                for idx, p in enumerate(bodies) if p.shape == "rod"
+            ]
+            c.execute("""INSERT INTO ensembles (
+                ensemble_id, ensemble_type, dipole_size, cloud_radius, plasmonic_fv, dielectric_fv, pdi
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
                 (
                     ensemble_id,
-                    idx,
-                    particle.material_idx,
-                    particle.material,
-                    particle.shape,
-                    particle.radius * ensemble.dipole_size,
-                    particle.height * ensemble.dipole_size if hasattr(particle, 'height') else None,  # length is only for rods
-                    particle.volume * ensemble.dipole_size**3,
-                    *(particle.position) * ensemble.dipole_size,
-                    *(particle.rotation if hasattr(particle, 'rotation') else (None, None, None))
+                    ensemble.option,
+                    ensemble.dipole_size,
+                    ensemble.cloud_radius * ensemble.dipole_size,
+                    ensemble.particle_data["plasmonic"]["volume_fraction"],
+                    ensemble.particle_data["dielectric"]["volume_fraction"],
+                    ensemble.polydispersity,
                 )
             )
-        ensemble_db.commit()
-        c.close(), ensemble_db.close()
+            # one prepared statement reused for every particle
+            c.executemany("""INSERT INTO ensemble_particles (
+                ensemble_id, particle_idx, material_idx, material, shape, radius, length, volume, cx, cy, cz, rx, ry, rz, dipoles
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        else:
+            c.execute("COMMIT")
+        finally:
+            c.close()
         return ensemble_id
     
     def update_ensembe_info(self, ensemble_id, calculation_type):
@@ -172,45 +305,86 @@ class Storer:
             Identifier of the target ensemble.
         calculation_type : {'ensemble_data', 'ddscat_run', 'postprocessing_run'}
             Name of the flag to update.
+
+        Raises
+        ------
+        ValueError
+            If ``calculation_type`` is not one of the flag columns.
         """
-        ensemble_db = sqlite3.connect(self.data_db)
-        c = ensemble_db.cursor()
-        if calculation_type == "ensemble_data":
-            c.execute("UPDATE ensembles SET ensemble_data = 1 WHERE ensemble_id = ?", (ensemble_id,))
-        elif calculation_type == "ddscat_run":
-            c.execute("UPDATE ensembles SET ddscat_run = 1 WHERE ensemble_id = ?", (ensemble_id,))
-        elif calculation_type == "postprocessing_run":
-            c.execute("UPDATE ensembles SET postprocessing_run = 1 WHERE ensemble_id = ?", (ensemble_id,))
-        ensemble_db.commit()
-        c.close(), ensemble_db.close()
-
-
-def generate_new_key(key_db, n_bytes=5):
+        self.mark_done(ensemble_id, calculation_type)
+
+    def mark_done(self, ensemble_id, *calculation_types):
+        """
+        Mark several calculation flags as completed in a single ``UPDATE``.
+
+        Parameters
+        ----------
+        ensemble_id : str
+            Identifier of the target ensemble.
+        *calculation_types : {'ensemble_data', 'ddscat_run', 'postprocessing_run'}
+            Names of the flags to set; nothing is written if none are given.
+
+        Raises
+        ------
+        ValueError
+            If any name is not one of the flag columns.
+        """
+        # column names can't be bound as parameters, so only known flags
+        # are ever interpolated into the statement
+        unknown = set(calculation_types) - _FLAG_COLUMNS
+        if unknown:
+            raise ValueError(f"unknown calculation type: {sorted(unknown)[0]!r}")
+        if not calculation_types:
+            return
+        columns = ", ".join(f"{name} = 1" for name in dict.fromkeys(calculation_types))
+        self.db.execute(f"UPDATE ensembles SET {columns} WHERE ensemble_id = ?", (ensemble_id,))
+
+
+def generate_new_key(db, n_bytes=8):
     """
     Allocate and persist a new unique hexadecimal key.
 
-    Keys are stored inside a shelve file so future allocations avoid
-    collisions across application runs.
+    Keys are inserted into the ``keys`` table, whose primary key rejects
+    duplicates, so future allocations avoid collisions across application
+    runs and processes. When called inside an open transaction the key is
+    committed (or rolled back) together with it.
 
     Parameters
     ----------
-    key_db : str
-        Path/prefix of the shelve database used for key storage.
-    n_bytes : int, default=5
+    db : sqlite3.Connection
+        Connection to the ensemble database.
+    n_bytes : int, default=8
         Number of random bytes to generate; the resulting key length will
-        be ``2 * n_bytes`` hexadecimal characters.
+        be ``2 * n_bytes`` hexadecimal characters. At 64 bits a collision
+        is practically impossible, so the first token is almost always
+        accepted without a retry.
 
     Returns
     -------
     str
         Newly generated unique key.
     """
-    db = shelve.open(key_db, writeback=False)
     while True:
         token = secrets.token_hex(n_bytes)
-        if token in db:
+        try:
+            db.execute("INSERT INTO keys (token) VALUES (?)", (token,))
+        except sqlite3.IntegrityError:
             continue
-        db[token] = True
-        db.sync()
         return token
-    
+
+
+def load_dipoles(blob):
+    """
+    Decode a stored ``dipoles`` BLOB.
+
+    Parameters
+    ----------
+    blob : bytes
+        Raw bytes written by :meth:`Storer.store_new_ensemble`.
+
+    Returns
+    -------
+    numpy.ndarray, shape (M, 3), dtype int32
+        Read‑only view over ``blob``; no copy is made.
+    """
+    return np.frombuffer(blob, dtype=np.int32).reshape(-1, 3)
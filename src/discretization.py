@@ -8,9 +8,14 @@ coordinates suitable for DDSCAT input.
 
 Functions
 ---------
-rotate(points, rotation)
-    Apply successive x/y/z Euler‑angle rotations (degrees) to a set of
-    3‑D points.
+unique_lattice(points)
+    Round points to integer lattice coordinates and remove duplicates.
+euler_to_matrix(rotation)
+    Build the combined x/y/z Euler‑angle (degrees) rotation matrix.
+rotate(points, rotation_matrix)
+    Apply a rotation matrix to a set of 3‑D points.
+discretize_all(bodies)
+    Fill in the cached lattice of every body that has none yet.
 
 Classes
 -------
@@ -27,59 +32,142 @@ Rod
 """
 import numpy as np
 
+# lattice coordinates are packed into one int64 key per dipole, 21 bits per
+# axis, so |x|, |y|, |z| must stay below _KEY_OFFSET
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
 
-def rotate(points, rotation):
+
+def unique_lattice(points):
+    """
+    Round points to the integer lattice and drop duplicates.
+
+    Each rounded ``(x, y, z)`` is packed into a single int64 with ``x`` in
+    the high bits, so a 1‑D :func:`numpy.unique` gives the same
+    lexicographic row order as ``np.unique(..., axis=0)`` at a fraction
+    of the cost.
+
+    Parameters
+    ----------
+    points : array_like, shape (N, 3)
+        Coordinates in dipole units.
+
+    Returns
+    -------
+    numpy.ndarray, shape (M, 3), dtype int32
+        Unique lattice coordinates, sorted by x, then y, then z.
+    """
+    lattice = np.rint(points).astype(np.int64) + _KEY_OFFSET
+    keys = np.unique((lattice[:, 0] << 2 * _KEY_BITS) | (lattice[:, 1] << _KEY_BITS) | lattice[:, 2])
+    unique = np.empty((len(keys), 3), dtype=np.int32)
+    unique[:, 0] = (keys >> 2 * _KEY_BITS) - _KEY_OFFSET
+    unique[:, 1] = ((keys >> _KEY_BITS) & _KEY_MASK) - _KEY_OFFSET
+    unique[:, 2] = (keys & _KEY_MASK) - _KEY_OFFSET
+    return unique
+
+
+def _column_points(half_width, zmax):
     """
-    Rotate an array of points by three Euler angles (degrees).
+    Expand per‑column z extents into lattice points.
+
+    Parameters
+    ----------
+    half_width : int
+        The x and y axes run over ``-half_width .. half_width``.
+    zmax : numpy.ndarray, shape (2*half_width + 1, 2*half_width + 1)
+        Largest ``|z|`` inside the body for each (x, y) column; negative
+        for columns that miss the body entirely.
+
+    Returns
+    -------
+    numpy.ndarray, shape (N, 3)
+        Integer points ``(x, y, z)`` with ``|z| <= zmax[x, y]``.
+    """
+    ix, iy = np.nonzero(zmax >= 0)
+    zmax = zmax[ix, iy]
+    counts = 2 * zmax + 1
+    # z runs from -zmax to zmax within each column
+    offsets = np.repeat(np.cumsum(counts) - counts + zmax, counts)
+    points = np.empty((counts.sum(), 3), dtype=np.int64)
+    points[:, 0] = np.repeat(ix - half_width, counts)
+    points[:, 1] = np.repeat(iy - half_width, counts)
+    points[:, 2] = np.arange(len(points)) - offsets
+    return points
+
+
+def euler_to_matrix(rotation):
+    """
+    Combined rotation matrix for three Euler angles (degrees).
 
     Rotations are applied in X→Y→Z order using the right‑hand rule.
 
     Parameters
     ----------
-    points : array_like, shape (N, 3) or (2, 3)
-        Input coordinates to transform.
     rotation : sequence[float]
         Three angles in degrees (rx, ry, rz).
 
+    Returns
+    -------
+    numpy.ndarray, shape (3, 3)
+        Matrix ``R`` such that ``points @ R`` rotates row vectors.
+    """
+    cx, cy, cz = np.cos(np.deg2rad(rotation)).tolist()
+    sx, sy, sz = np.sin(np.deg2rad(rotation)).tolist()
+
+    rotation_matrix_x = np.zeros((3, 3))
+    rotation_matrix_x[0, 0] = 1
+    rotation_matrix_x[1, 1], rotation_matrix_x[1, 2] = cx, -sx
+    rotation_matrix_x[2, 1], rotation_matrix_x[2, 2] = sx, cx
+
+    rotation_matrix_y = np.zeros((3, 3))
+    rotation_matrix_y[0, 0], rotation_matrix_y[0, 2] = cy, sy
+    rotation_matrix_y[1, 1] = 1
+    rotation_matrix_y[2, 0], rotation_matrix_y[2, 2] = -sy, cy
+
+    rotation_matrix_z = np.zeros((3, 3))
+    rotation_matrix_z[0, 0], rotation_matrix_z[0, 1] = cz, -sz
+    rotation_matrix_z[1, 0], rotation_matrix_z[1, 1] = sz, cz
+    rotation_matrix_z[2, 2] = 1
+
+    # Combine the three rotations by multiplying the matrices in the desired order
+    return rotation_matrix_x @ (rotation_matrix_y @ rotation_matrix_z)
+
+
+def rotate(points, rotation_matrix):
+    """
+    Rotate an array of points by a precomputed rotation matrix.
+
+    Parameters
+    ----------
+    points : array_like, shape (N, 3) or (2, 3)
+        Input coordinates to transform.
+    rotation_matrix : numpy.ndarray, shape (3, 3)
+        Matrix from :func:`euler_to_matrix`.
+
     Returns
     -------
     numpy.ndarray
         Rotated coordinates with the same leading shape as ``points``.
     """
-    rotation_angle_x = np.deg2rad(rotation[0])
-    rotation_angle_y = np.deg2rad(rotation[1])
-    rotation_angle_z = np.deg2rad(rotation[2])
-
-    rotation_matrix_x = np.array(
-        [
-            [1, 0, 0],
-            [0, np.cos(rotation_angle_x), -np.sin(rotation_angle_x)],
-            [0, np.sin(rotation_angle_x), np.cos(rotation_angle_x)],
-        ]
-    )
-
-    rotation_matrix_y = np.array(
-        [
-            [np.cos(rotation_angle_y), 0, np.sin(rotation_angle_y)],
-            [0, 1, 0],
-            [-np.sin(rotation_angle_y), 0, np.cos(rotation_angle_y)],
-        ]
-    )
-
-    rotation_matrix_z = np.array(
-        [
-            [np.cos(rotation_angle_z), -np.sin(rotation_angle_z), 0],
-            [np.sin(rotation_angle_z), np.cos(rotation_angle_z), 0],
-            [0, 0, 1],
-        ]
-    )
+    return np.asarray(points, dtype=float) @ rotation_matrix
 
-    # Combine the three rotations by multiplying the matrices in the desired order
-    rotation_matrix = np.dot(
-        rotation_matrix_x, np.dot(rotation_matrix_y, rotation_matrix_z)
-    )
 
-    return np.dot(points, rotation_matrix)
+def discretize_all(bodies):
+    """
+    Discretize every body that has no cached lattice yet.
+
+    Runs serially: a body takes about a millisecond, far less than
+    starting a process pool and pickling the lattices back would cost.
+    Each result is stored in the body's :attr:`dipoles`.
+
+    Parameters
+    ----------
+    bodies : list
+        Sphere and rod bodies.
+    """
+    for body in bodies:
+        body.discretize()
 
 
 class ShapeFactory:
@@ -110,11 +198,7 @@ class ShapeFactory:
         Sphere or Rod
             Newly created shape instance.
         """
-        if parameters["shape"] == "sphere":
-            body = Sphere(parameters)
-        if parameters["shape"] == "rod":
-            body = Rod(parameters, rotation=rotation)
-        return body
+        return _SHAPES[parameters["shape"]](parameters, rotation=rotation)
 
 
 class Sphere:
@@ -126,6 +210,9 @@ class Sphere:
     data : dict
         Dictionary with key ``'params'`` whose first element is the
         sphere radius.
+    rotation : optional
+        Ignored; a sphere has no orientation. Accepted so every shape
+        shares the constructor signature used by :class:`ShapeFactory`.
 
     Attributes
     ----------
@@ -133,14 +220,37 @@ class Sphere:
         Sphere radius in dipole units.
     center : numpy.ndarray, shape (3,)
         Current center position (updated by :meth:`move`).
+    dipoles : numpy.ndarray or list
+        Lattice points from the last :meth:`discretize` call, or an empty
+        list until then; cleared by :meth:`move`.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, rotation=None):
         self.shape = "sphere"
         self.radius = data["params"][0]
         self.center = np.array([0.0, 0.0, 0.0])
         self.dipoles = []
 
+    def clone(self):
+        """
+        Create an unmoved copy of this sphere.
+
+        Attributes set after construction (e.g. ``material``) are carried
+        over, so a configured prototype can be stamped out repeatedly
+        without going back through :class:`ShapeFactory`.
+
+        Returns
+        -------
+        Sphere
+            New sphere centered at the origin.
+        """
+        body = Sphere.__new__(Sphere)
+        body.__dict__.update(self.__dict__)
+        body.__dict__.pop("position", None)
+        body.center = np.array([0.0, 0.0, 0.0])
+        body.dipoles = []
+        return body
+
     @property
     def volume(self):
         """
@@ -164,6 +274,7 @@ class Sphere:
         """
         self.position = np.array(position)
         self.center += self.position
+        self.dipoles = []
         
     def point_inside(self, point):
         """
@@ -179,33 +290,40 @@ class Sphere:
         bool
             True if the point is within the radius.
         """
-        distance = np.linalg.norm(point)
-        # Check if point is inside the sphere
-        return distance <= self.radius
+        x, y, z = point[0], point[1], point[2]
+        # compare squared distances, no sqrt needed
+        return x*x + y*y + z*z <= self.radius*self.radius
 
     def discretize(self):
         """
         Generate integer lattice dipoles filling the sphere volume.
 
+        The result is cached in :attr:`dipoles` until the sphere moves.
+
         Returns
         -------
-        numpy.ndarray, shape (M, 3)
+        numpy.ndarray, shape (M, 3), dtype int32
             Unique integer coordinates belonging to the sphere.
         """
-        rad_array = np.ceil([self.radius, self.radius, self.radius])
-        min_position = -rad_array.astype(int)
-        max_position = rad_array.astype(int)
-
-        dipoles = []
-        for x in range(min_position[0], max_position[0] + 1):
-            for y in range(min_position[1], max_position[1] + 1):
-                for z in range(min_position[2], max_position[2] + 1):
-                    point = np.array([x, y, z])
-                    if self.point_inside(point):
-                        dipoles.append(point)
-        dipoles = np.array(dipoles + np.array(self.center))
-        dipoles = np.unique(np.around(dipoles).astype(int), axis=0)
-        return dipoles
+        if len(self.dipoles):
+            return self.dipoles
+        n = int(np.ceil(self.radius))
+        axis = np.arange(-n, n + 1)
+        r2 = self.radius**2
+        axial2 = axis[:, None]**2 + axis[None, :]**2
+        # each (x, y) column holds |z| <= sqrt(r^2 - x^2 - y^2); the floor
+        # is nudged by one where sqrt rounding lands on the wrong integer
+        zmax = np.floor(np.sqrt(np.maximum(r2 - axial2, 0))).astype(np.int64)
+        zmax += axial2 + (zmax + 1)**2 <= r2
+        zmax -= axial2 + zmax**2 > r2
+        dipoles = _column_points(n, zmax)
+        center = np.asarray(self.center)
+        if np.all(center == np.rint(center)):
+            # an integer shift keeps the lattice points unique and in order
+            self.dipoles = (dipoles + center.astype(np.int64)).astype(np.int32)
+        else:
+            self.dipoles = unique_lattice(dipoles + center)
+        return self.dipoles
 
 
 class Rod:
@@ -233,14 +351,25 @@ class Rod:
         Total end‑to‑end length including caps.
     rotation : numpy.ndarray, shape (3,)
         Euler angles applied to the canonical orientation.
+    rotation_matrix : numpy.ndarray, shape (3, 3)
+        Matrix built once from ``rotation`` and reused by
+        :meth:`discretize`.
     center : numpy.ndarray, shape (2, 3)
         Rotated endpoints of the cylindrical segment.
+    dipoles : numpy.ndarray or list
+        Lattice points from the last :meth:`discretize` call, or an empty
+        list until then; cleared by :meth:`move`.
     """
 
     def __init__(self, data, rotation=[None, None, None]):
         self.shape = "rod"
         self.radius = data["params"][0]
         self.height = data["params"][1]
+        self._orient(rotation)
+        self.dipoles = []
+
+    def _orient(self, rotation):
+        """Set the rotation and the rotated segment endpoints about the origin."""
         if rotation == [None, None, None]:
             self.rotation = np.random.uniform(0, 360, size=3)
         else:
@@ -251,7 +380,34 @@ class Rod:
                 [0, 0, -(self.height / 2 - self.radius)],
             ]
         )
-        self.center = rotate(center, self.rotation)
+        self.rotation_matrix = euler_to_matrix(self.rotation)
+        self.center = rotate(center, self.rotation_matrix)
+
+    def clone(self, rotation=[None, None, None]):
+        """
+        Create an unmoved copy of this rod with a new orientation.
+
+        Attributes set after construction (e.g. ``material``) are carried
+        over, so a configured prototype can be stamped out repeatedly
+        without going back through :class:`ShapeFactory`.
+
+        Parameters
+        ----------
+        rotation : list[float] or list[None], optional
+            Euler angles for the copy, as in the constructor; if all
+            ``None`` a new random rotation is drawn.
+
+        Returns
+        -------
+        Rod
+            New rod whose segment midpoint is at the origin.
+        """
+        body = Rod.__new__(Rod)
+        body.__dict__.update(self.__dict__)
+        body.__dict__.pop("position", None)
+        body._orient(rotation)
+        body.dipoles = []
+        return body
 
     @property
     def volume(self):
@@ -271,6 +427,7 @@ class Rod:
         
         self.center += np.array(position)
         self.position = np.array(position)
+        self.dipoles = []
         
 
     def point_inside_rod(self, point):
@@ -287,9 +444,9 @@ class Rod:
         bool
             True if within radius and interior height.
         """
-        distance_xy = np.linalg.norm(point[:2])
+        x, y = point[0], point[1]
         # Check if the point is within the cylinder's radius and height
-        return distance_xy <= self.radius and abs(point[2]) <= (
+        return x*x + y*y <= self.radius*self.radius and abs(point[2]) <= (
             self.height / 2 - self.radius
         )
 
@@ -307,73 +464,110 @@ class Rod:
         bool
             True if inside either spherical tip.
         """
-        rod_height = np.array([0, 0, self.height / 2 - self.radius])
-        distance_pos = np.linalg.norm(point - rod_height)
-        distance_neg = np.linalg.norm(point + rod_height)
-        return distance_pos <= self.radius or distance_neg <= self.radius
+        half = self.height / 2 - self.radius
+        x, y, z = point[0], point[1], point[2]
+        # squared distance to the nearer cap center
+        dz = abs(z) - half
+        return x*x + y*y + dz*dz <= self.radius*self.radius
 
     def discretize(self):
         """
         Generate integer lattice dipoles filling the rod volume.
 
+        The result is cached in :attr:`dipoles` until the rod moves.
+
         Returns
         -------
-        numpy.ndarray, shape (M, 3)
+        numpy.ndarray, shape (M, 3), dtype int32
             Unique integer coordinates for the rotated rod.
         """
-        bounds = np.array([np.ceil(self.radius), np.ceil(self.radius), np.ceil(self.height / 2)])
-
-        rod_points = []
-        for x in np.linspace(-bounds[0], bounds[0], int(2 * bounds[0] + 1)):
-            for y in np.linspace(-bounds[1], bounds[1], int(2 * bounds[1] + 1)):
-                for z in np.linspace(-bounds[2], bounds[2], int(2 * bounds[2] + 1)):
-                    point = np.round([x, y, z])
-                    if self.point_inside_rod(point) or self.point_inside_tip(point):
-                        rod_points.append(point)
-        rotated_points = rotate(np.array(rod_points), self.rotation)
-        rod_points = rotated_points + np.average(self.center, axis=0)
-        dipoles = np.unique(np.around(rod_points).astype(int), axis=0)
-        return dipoles
+        if len(self.dipoles):
+            return self.dipoles
+        nr = int(np.ceil(self.radius))
+        xy = np.arange(-nr, nr + 1)
+        half = self.height / 2 - self.radius
+        r2 = self.radius**2
+
+        def inside(axial2, z):
+            # within the cylindrical segment, or within the nearer cap
+            return (axial2 <= r2) & ((z <= half) | (axial2 + (z - half)**2 <= r2))
+
+        # each (x, y) column holds |z| <= half + sqrt(r^2 - x^2 - y^2); the
+        # floor is nudged by one where sqrt rounding lands on the wrong integer
+        axial2 = xy[:, None]**2 + xy[None, :]**2
+        zmax = np.floor(half + np.sqrt(np.maximum(r2 - axial2, 0))).astype(np.int64)
+        zmax += inside(axial2, zmax + 1)
+        zmax -= ~inside(axial2, zmax)
+        zmax[axial2 > r2] = -1
+        rod_points = _column_points(nr, zmax)
+        rotated_points = rotate(rod_points, self.rotation_matrix)
+        self.dipoles = unique_lattice(rotated_points + np.average(self.center, axis=0))
+        return self.dipoles
         
 
+# shape name -> class, used by ShapeFactory.shape_selector
+_SHAPES = {"sphere": Sphere, "rod": Rod}
+
+
+def _write_shape_case(sphere_dipoles, rod_dipoles, case):
+    """
+    Write ``shape_<r>_<theta>.dat`` for one sphere–rod configuration of
+    the ``__main__`` sweep.
+
+    Parameters
+    ----------
+    sphere_dipoles, rod_dipoles : numpy.ndarray, shape (N, 3)
+        Discretized bodies; the sphere is centered at the origin.
+    case : tuple
+        ``(r, theta, location)`` with the sphere displacement.
+    """
+    r_val, theta_val, location = case
+    sphere_dipoles = unique_lattice(sphere_dipoles + np.asarray(location))
+    total_dipoles = len(sphere_dipoles) + len(rod_dipoles)
+    n_sphere = len(sphere_dipoles)
+    # JA IX IY IZ ICOMP rows, formatted in one pass per body
+    sphere_rows = np.column_stack([np.arange(1, n_sphere + 1), sphere_dipoles])
+    rod_rows = np.column_stack([np.arange(n_sphere + 1, total_dipoles + 1), rod_dipoles])
+    payload = (("%d %d %d %d 1 1 1\n" * n_sphere) % tuple(sphere_rows.ravel().tolist())
+               + ("%d %d %d %d 2 2 2\n" * len(rod_dipoles)) % tuple(rod_rows.ravel().tolist()))
+    with open(f"shape_{r_val}_{theta_val}.dat", "w") as f:
+        pre = [ f"R = {r_val}, theta = {theta_val}\n",
+                f"{total_dipoles} = NAT \n",
+                "1.000000  0.000000  0.000000 = A_1 vector\n",
+                "0.000000  1.000000  0.000000 = A_2 vector\n",
+                "1.000000  1.000000  1.000000 = lattice spacings (d_x,d_y,d_z)/d\n",
+                "0.000000  0.000000  0.000000 = lattice offset x0(1-3) = (x_TF,y_TF,z_TF)/d for dipole 0 0 0\n",
+                "JA  IX  IY  IZ ICOMP(x,y,z)\n"]
+        f.write("".join(pre) + payload)
+
+
 if __name__ == "__main__":
-    rod = Rod([10, 45], rotation=[0, 0, 0])
-    sphere = Sphere([10])
+    from functools import partial
+    from multiprocessing import Pool
+
+    rod = Rod({"params": [10, 45]}, rotation=[0, 0, 0])
+    sphere = Sphere({"params": [10]})
     
     r = np.arange(20, 210, 10)
     theta = np.arange(0, 95, 5)
 
     visualize = False
     print((3 * (sphere.volume + rod.volume)/(4 * np.pi)) ** (1/3)/1e3)
+    # both bodies are discretized once; each case only shifts the sphere
     sphere_dipoles = sphere.discretize()
-    rod_dipoles = np.rint(rod.discretize()).astype(int)
-    results = np.zeros((len(sphere_dipoles), len(rod_dipoles)))
+    rod_dipoles = rod.discretize()
+    cos_theta = np.cos(np.deg2rad(theta))
+    sin_theta = np.sin(np.deg2rad(theta))
+    cases = []
     for r_idx in range(len(r)):
         for t_idx in range(len(theta)):
-            sphere_dipoles = sphere.discretize()
-            location = [0, r[r_idx] * np.cos(np.deg2rad(theta[t_idx])), r[r_idx] * np.sin(np.deg2rad(theta[t_idx]))]
+            location = [0, r[r_idx] * cos_theta[t_idx], r[r_idx] * sin_theta[t_idx]]
             if location[1] < 22 and location[2] < 35:
                 continue
-            else:
-                sphere_dipoles += location
-                sphere_dipoles = np.unique(np.rint(sphere_dipoles), axis=0).astype(int)
-                total_dipoles = len(sphere_dipoles) + len(rod_dipoles)
-                row_count = 1          
-                with open("shape.dat", "w") as f:
-                    pre = [ f"R = {r[r_idx]}, theta = {theta[t_idx]}\n",
-                            f"{total_dipoles} = NAT \n",
-                            "1.000000  0.000000  0.000000 = A_1 vector\n",
-                            "0.000000  1.000000  0.000000 = A_2 vector\n",
-                            "1.000000  1.000000  1.000000 = lattice spacings (d_x,d_y,d_z)/d\n",
-                            "0.000000  0.000000  0.000000 = lattice offset x0(1-3) = (x_TF,y_TF,z_TF)/d for dipole 0 0 0\n",
-                            "JA  IX  IY  IZ ICOMP(x,y,z)\n"]
-                    f.writelines(pre)
-                    for row in sphere_dipoles:
-                        f.write(f"{row_count} {row[0]} {row[1]} {row[2]} 1 1 1\n")
-                        row_count += 1
-                    for row in rod_dipoles:
-                        f.write(f"{row_count} {row[0]} {row[1]} {row[2]} 2 2 2\n")
-                        row_count += 1
+            cases.append((r[r_idx], theta[t_idx], location))
+
+    with Pool() as pool:
+        pool.map(partial(_write_shape_case, sphere_dipoles, rod_dipoles), cases)
                 
     
     if visualize:
@@ -19,12 +19,370 @@ Usage
 >>> cloud = CloudGenerator().generate_cloud(system, materials, option="v2e")
 >>> dipoles = cloud.discretize_cloud()
 """
+import math
+import os
 import numpy as np
-from discretization import ShapeFactory
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache, partial
+from itertools import product
+from discretization import ShapeFactory, unique_lattice
 from Calculator import Calculator
+from Storer import load_dipoles, shared_connection
 from time import time
 import logging
-import sqlite3
+
+
+# relative (i, j, k) offsets of a grid cell and its 26 neighbours
+_NEIGHBOR_CELLS = tuple(product((-1, 0, 1), repeat=3))
+
+# below this many neighbours testing them one by one beats the fixed
+# cost of the vectorized bounding-sphere screen
+_SCREEN_MIN = 16
+
+# cell_to_ensemble grids with at least this many cells are filled in a
+# process pool; smaller ones do not amortize starting the workers
+_PARALLEL_CELLS = 4096
+
+
+def _extent(body):
+    """Distance from a body's midpoint to its farthest surface point."""
+    return body.height / 2 if body.shape == "rod" else body.radius
+
+
+class _BodyGrid:
+    """
+    Uniform hash grid of placed bodies keyed by their midpoints.
+
+    With a cell edge of at least ``2 * max_extent + separation`` any body
+    that can collide with a new one lies in the 27 cells around the new
+    body's midpoint, so placement only tests those instead of every body.
+
+    Each body's index is filed under all 27 cells of the block around its
+    own cell, so the neighbourhood of a candidate is a single dict lookup
+    instead of 27; bodies are added far less often than candidates are
+    tested.
+
+    Midpoints, extents and shapes are kept as contiguous arrays indexed
+    like ``bodies`` (cells store indices), so the neighbours of a
+    candidate are screened with one vectorized bounding‑sphere test. That
+    test is exact for sphere pairs; only surviving pairs involving a rod
+    go through the segment distance. Sparse neighbourhoods skip the screen
+    and are tested directly.
+
+    Parameters
+    ----------
+    cell_size : float
+        Edge length of a grid cell in dipole units.
+    capacity : int, default=256
+        Initial length of the midpoint/extent arrays; doubled as needed.
+    """
+
+    def __init__(self, cell_size, capacity=256):
+        self.cell_size = cell_size
+        self.blocks = defaultdict(list)
+        self.bodies = []
+        self.midpoints = np.empty((capacity, 3))
+        self.extents = np.empty(capacity)
+        self.is_rod = np.empty(capacity, dtype=bool)
+
+    def _key(self, point):
+        c = self.cell_size
+        return (math.floor(point[0] / c), math.floor(point[1] / c), math.floor(point[2] / c))
+
+    def add(self, body, midpoint):
+        """Register ``body`` in the block of every cell around ``midpoint``."""
+        n = len(self.bodies)
+        if n == len(self.extents):
+            self.midpoints = np.concatenate([self.midpoints, np.empty_like(self.midpoints)])
+            self.extents = np.concatenate([self.extents, np.empty_like(self.extents)])
+            self.is_rod = np.concatenate([self.is_rod, np.empty_like(self.is_rod)])
+        self.midpoints[n] = midpoint
+        self.extents[n] = _extent(body)
+        self.is_rod[n] = body.shape == "rod"
+        self.bodies.append(body)
+        i, j, k = self._key(midpoint)
+        blocks = self.blocks
+        for di, dj, dk in _NEIGHBOR_CELLS:
+            blocks[i + di, j + dj, k + dk].append(n)
+
+    def near(self, midpoint):
+        """
+        Indices of bodies in the cell containing ``midpoint`` and its
+        neighbours; the returned list is shared and must not be modified.
+        """
+        return self.blocks.get(self._key(midpoint), ())
+
+    def collides(self, body, midpoint, distance_to, gap):
+        """
+        Whether ``body`` displaced by ``midpoint`` comes closer than
+        ``gap`` to any registered body.
+        """
+        near = self.near(midpoint)
+        if len(near) >= _SCREEN_MIN:
+            near = np.array(near)
+            # bounding spheres: bodies whose midpoints are further apart
+            # than both extents plus the gap cannot touch
+            diff = self.midpoints[near] - midpoint
+            reach = self.extents[near] + (_extent(body) + gap)
+            hit = np.einsum("ij,ij->i", diff, diff) < reach * reach
+            if body.shape == "sphere":
+                # between two spheres the bounding test is already exact
+                rod = self.is_rod[near]
+                if (hit & ~rod).any():
+                    return True
+                hit &= rod
+            near = near[hit].tolist()
+        trial_center = body.center + midpoint
+        is_sphere = body.shape == "sphere"
+        for idx in near:
+            old_body = self.bodies[idx]
+            limit = body.radius + old_body.radius + gap
+            if is_sphere and old_body.shape == "sphere":
+                if Calculator.sqdist(trial_center, old_body.center) < limit * limit:
+                    return True
+            elif distance_to[old_body.shape](trial_center, old_body.center) < limit:
+                return True
+        return False
+
+
+@lru_cache(maxsize=32)
+def _pick_counts_and_cell_size(V1, V2, phi1, phi2, max_denom=20):
+    """
+    Particle counts and edge length of a cell‑to‑ensemble cell.
+
+    ``N1`` plasmonic and ``N2`` dielectric bodies per cubic cell reproduce
+    the target volume‑fraction ratio ``phi1 / phi2``; the cell edge then
+    fixes ``phi1``. The result depends only on these numbers, so it is
+    memoized across generations.
+
+    Parameters
+    ----------
+    V1, V2 : float
+        Volume of one plasmonic / dielectric body in dipole units.
+    phi1, phi2 : float
+        Target plasmonic / dielectric volume fractions.
+    max_denom : int, default=20
+        Largest ``N2`` considered.
+
+    Returns
+    -------
+    tuple[int, int, int]
+        ``(N1, N2, L)`` with ``L`` the cell edge length in dipole units.
+    """
+    # 1) target ratio N1/N2 = (phi1*V2) / (phi2*V1)
+    r = (phi1*V2) / (phi2*V1)
+
+    # 2) approximate r by N1/N2 with small denominators: walk the
+    # continued fraction of r until the next convergent's denominator
+    # exceeds max_denom, then take whichever of the last convergent and
+    # the best semiconvergent is closer (the same answer as
+    # Fraction.limit_denominator)
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    x = r
+    while True:
+        a = math.floor(x)
+        q2 = q0 + a * q1
+        if q2 > max_denom:
+            break
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+        x -= a
+        if x == 0:
+            break
+        x = 1 / x
+    N1, N2 = p1, q1
+    if x != 0:
+        k = (max_denom - q0) // q1
+        p2, q2 = p0 + k * p1, q0 + k * q1
+        if abs(p2 / q2 - r) < abs(p1 / q1 - r):
+            N1, N2 = p2, q2
+
+    # 3) compute exact V_cell to meet phi1
+    Vcell = (N1 * V1) / phi1         # in dipole‑volume units
+
+    # 4) edge length in dipole units
+    L = math.ceil(Vcell ** (1/3))
+
+    return N1, N2, L
+
+
+def _fill_cell(cell_position, seed, prototypes, n_plas, n_diel, cell_size):
+    """
+    Place one cell's worth of bodies for the cell‑to‑ensemble strategy.
+
+    Bodies are rejection‑sampled uniformly inside the cubic cell and only
+    tested against the bodies already in the same cell.
+
+    Parameters
+    ----------
+    cell_position : numpy.ndarray, shape (3,)
+        Center of the cell.
+    seed : numpy.random.Generator, SeedSequence or int
+        The cell's own generator (or its seed), so the outcome does not
+        depend on which process fills the cell.
+    prototypes : dict[str, Sphere or Rod]
+        Configured ``"plasmonic"`` / ``"dielectric"`` bodies to clone.
+    n_plas, n_diel : int
+        Number of plasmonic and dielectric bodies in the cell.
+    cell_size : float
+        Cell edge length in dipole units.
+
+    Returns
+    -------
+    list or None
+        Placed bodies, or ``None`` if a body exceeded 500 failed trials.
+    """
+    rng = np.random.default_rng(seed)
+    half_cell = cell_size / 2
+    cell_bodies = []
+    for idx in range(n_plas + n_diel):
+        trials = 0
+        is_placed = False
+        prototype = prototypes["plasmonic" if (idx < n_plas) else "dielectric"]
+        if prototype.shape == "rod":
+            body = prototype.clone(rotation=rng.uniform(0, 360, size=3).tolist())
+        else:
+            body = prototype.clone()
+        distance_to = {shape: Calculator.distance_kernel(body.shape, shape)
+                       for shape in ("sphere", "rod")}
+        # displacement bounds keeping the body inside the cell, and one
+        # buffer for the trial center; both are fixed for the body, so no
+        # trial allocates more than its random draw
+        body_min = cell_position - half_cell - np.min(body.center, axis=0)
+        body_max = cell_position + half_cell - np.max(body.center, axis=0)
+        trial_center = np.empty_like(body.center)
+        is_sphere = body.shape == "sphere"
+        while not is_placed:
+            is_colliding = False
+            particle_position = rng.uniform(body_min, body_max)
+            np.add(body.center, particle_position, out=trial_center)
+            for old_body in cell_bodies:
+                limit = body.radius + old_body.radius + 1
+                if (
+                    Calculator.sqdist(trial_center, old_body.center) < limit * limit
+                    if is_sphere and old_body.shape == "sphere"
+                    else distance_to[old_body.shape](trial_center, old_body.center) < limit
+                ):
+                    is_colliding = True
+                    trials += 1
+                    if trials > 500:
+                        return None
+                    break
+            if not is_colliding:
+                body.move(particle_position)
+                cell_bodies.append(body)
+                is_placed = True
+    return cell_bodies
+
+
+def _inside_cloud(bodies, cloud_radius, rod_segment=False):
+    """
+    Flag the bodies that lie within ``cloud_radius`` of the origin.
+
+    Parameters
+    ----------
+    bodies : list[Sphere or Rod]
+        Placed bodies.
+    cloud_radius : float
+        Radius of the kept sphere.
+    rod_segment : bool, default=False
+        Measure a rod by the point of its segment nearest to the origin
+        instead of by its midpoint.
+
+    Returns
+    -------
+    numpy.ndarray, shape (N,), dtype bool
+        ``True`` where the body is kept.
+    """
+    is_rod = np.array([body.shape == "rod" for body in bodies], dtype=bool)
+    points = np.empty((len(bodies), 3))
+    points[~is_rod] = np.array(
+        [body.center for body in bodies if body.shape != "rod"], dtype=float
+    ).reshape(-1, 3)
+    if is_rod.any():
+        ends = np.array([body.center for body in bodies if body.shape == "rod"])
+        if rod_segment:
+            # nearest point of p1 + t*d, t in [0, 1], to the origin
+            p1, d = ends[:, 0], ends[:, 1] - ends[:, 0]
+            dd = np.einsum("ij,ij->i", d, d)
+            t = np.divide(-np.einsum("ij,ij->i", p1, d), dd, out=np.zeros_like(dd), where=dd > 0)
+            points[is_rod] = p1 + np.clip(t, 0, 1)[:, None] * d
+        else:
+            points[is_rod] = ends.mean(axis=1)
+    return np.einsum("ij,ij->i", points, points) < cloud_radius * cloud_radius
+
+
+def _ball_samples(rng, radius, batch=1024):
+    """
+    Endless stream of points distributed uniformly in a ball.
+
+    Draws are made ``batch`` at a time so the per‑trial cost is popping
+    one precomputed point rather than three generator calls.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        Source of randomness.
+    radius : float
+        Radius of the ball centered at the origin.
+    batch : int, default=1024
+        Points generated per refill.
+
+    Yields
+    ------
+    list[float]
+        ``[x, y, z]`` of the next sample.
+    """
+    while True:
+        # one call for all three coordinates of the whole batch
+        a, b, u = rng.random((3, batch))
+        phi       = 2 * np.pi * a
+        cos_theta = 2 * b - 1
+        sin_theta = np.sqrt(1 - cos_theta**2)
+
+        # pick r so that the CDF ~ r³ (this yields a uniform volume density)
+        r = u ** (1/3) * radius
+        points = np.stack([sin_theta * np.cos(phi) * r, sin_theta * np.sin(phi) * r, cos_theta * r], axis=1)
+        yield from points.tolist()
+
+
+def _place_in_ball(body, grid, distance_to, samples, gap, max_trials=500):
+    """
+    Rejection‑sample a free position for ``body`` inside a ball.
+
+    Candidate midpoints are taken from ``samples`` and tested against
+    nearby bodies in ``grid``.
+
+    Parameters
+    ----------
+    body : Sphere or Rod
+        Unplaced body built around the origin.
+    grid : _BodyGrid
+        Already placed bodies.
+    distance_to : dict[str, callable]
+        Distance kernel from ``body``'s shape to each other shape.
+    samples : iterator
+        Candidate positions, e.g. from :func:`_ball_samples`.
+    gap : float
+        Minimum surface separation between bodies.
+    max_trials : int, default=500
+        Number of collisions tolerated before giving up.
+
+    Returns
+    -------
+    list[float] or None
+        Accepted displacement, or ``None`` once more than ``max_trials``
+        candidates collided.
+    """
+    trials = 0
+    for position in samples:
+        # bodies are built around the origin, so the new body's midpoint
+        # is the displacement itself
+        if not grid.collides(body, position, distance_to, gap):
+            return position
+        trials += 1
+        if trials > max_trials:
+            return None
 
 
 class CloudGenerator:
@@ -43,10 +401,58 @@ class CloudGenerator:
         dipole coordinates.
     calculate_distribution()
         Histogram pairwise center distances for the current bodies.
+
+    Attributes
+    ----------
+    spheres_xyz : numpy.ndarray, shape (N, 3)
+        Cached centers of all spherical bodies.
+    rod_ends : numpy.ndarray, shape (M, 2, 3)
+        Cached segment endpoints of all rods.
+    mean_sphere_radius : float
+        Cached average radius over the spherical bodies.
+    rng : numpy.random.Generator
+        Source of every random draw made by :meth:`generate_cloud`.
     """
-    def __init__(self):
-        """Initialize helpers used during placement and analysis."""
+    def __init__(self, conn=None, seed=None):
+        """
+        Initialize helpers used during placement and analysis.
+
+        Parameters
+        ----------
+        conn : sqlite3.Connection, optional
+            Connection used by :meth:`read_cloud`. Defaults to
+            :func:`Storer.shared_connection`, the one every ``Storer``
+            uses as well.
+        seed : int or numpy.random.SeedSequence, optional
+            Seed for :attr:`rng`; equal seeds generate identical clouds.
+            Fresh OS entropy is used when omitted.
+        """
         self.calculator = Calculator()
+        self._conn = conn
+        self.rng = np.random.default_rng(seed)
+
+    @cached_property
+    def spheres_xyz(self):
+        """Centers of all spherical bodies as one contiguous array."""
+        centers = [body.center for body in self.bodies if body.shape == "sphere"]
+        return np.array(centers, dtype=float).reshape(-1, 3)
+
+    @cached_property
+    def rod_ends(self):
+        """Segment endpoints of all rods as one contiguous array."""
+        ends = [body.center for body in self.bodies if body.shape == "rod"]
+        return np.array(ends, dtype=float).reshape(-1, 2, 3)
+
+    @cached_property
+    def mean_sphere_radius(self):
+        """Average radius of the spherical bodies."""
+        radii = [body.radius for body in self.bodies if body.shape == "sphere"]
+        return sum(radii) / len(radii)
+
+    def _clear_geometry_cache(self):
+        """Drop the cached per‑shape arrays after ``bodies`` is rebuilt."""
+        for name in ("spheres_xyz", "rod_ends", "mean_sphere_radius"):
+            self.__dict__.pop(name, None)
 
     def read_cloud(self, ensemble_id):
         """
@@ -61,49 +467,67 @@ class CloudGenerator:
         -------
         CloudGenerator
             This instance for fluent chaining.
+
+        Raises
+        ------
+        ValueError
+            If no ensemble with ``ensemble_id`` is stored.
         """
-        conn = sqlite3.connect("ensembles.db")
-        conn.row_factory = sqlite3.Row
+        conn = self._conn if self._conn is not None else shared_connection()
         cur = conn.cursor()
-        cur.execute("""SELECT cloud_radius, dipole_size  FROM ensembles WHERE ensemble_id = ?""", (ensemble_id,))
-        ensemble_data = dict(cur.fetchone())
+        # one read transaction so metadata and particles come from the
+        # same snapshot even if a writer commits in between
+        cur.execute("BEGIN")
+        try:
+            cur.execute("""SELECT cloud_radius, dipole_size  FROM ensembles WHERE ensemble_id = ?""", (ensemble_id,))
+            meta = cur.fetchone()
+            if meta is None:
+                raise ValueError(f"no ensemble with id {ensemble_id!r}")
+            cloud_radius, dipole_size = meta
+            # fixed column order so rows unpack by position; the center
+            # comes last so all of them can be scaled in one array operation
+            cur.execute("""SELECT shape, radius, length, rx, ry, rz, material_idx, material, dipoles, cx, cy, cz
+                FROM ensemble_particles WHERE ensemble_id = ? ORDER BY particle_idx""", (ensemble_id,))
+            rows = cur.fetchall()
+        except Exception:
+            # never leave the shared connection inside a transaction
+            cur.execute("ROLLBACK")
+            cur.close()
+            raise
+        cur.execute("COMMIT")
         self.ensemble_id = ensemble_id
-        self.dipole_size = ensemble_data["dipole_size"]
-        self.cloud_radius = ensemble_data["cloud_radius"] / self.dipole_size
-        cur.execute("""SELECT * FROM ensemble_particles WHERE ensemble_id = ?""", (self.ensemble_id,))
+        self.dipole_size = dipole_size
+        self.cloud_radius = cloud_radius / self.dipole_size
         self.bodies = []
+        self._clear_geometry_cache()
         self.materials = {}
         plas_recorded = False
         diel_recorded = False
-        for row in cur.fetchall():
-            particle = dict(row)
-            if particle["shape"] == "sphere":
-                particle["params"] = [particle["radius"] / self.dipole_size]                
-            elif particle["shape"] == "rod":
-                particle["params"] = [
-                    particle["radius"] / self.dipole_size,
-                    particle["length"] / self.dipole_size
-                ]
+        d = self.dipole_size
+        centers = np.array([row[9:] for row in rows], dtype=float).reshape(-1, 3) / d
+        for (shape, radius, length, rx, ry, rz, material_idx, material, dipoles, _, _, _), center in zip(rows, centers):
+            if shape == "sphere":
+                params = [radius / d]
+            elif shape == "rod":
+                params = [radius / d, length / d]
             body = ShapeFactory.shape_selector(
-                particle, rotation=[particle["rx"], particle["ry"], particle["rz"]]
+                {"shape": shape, "params": params}, rotation=[rx, ry, rz]
             )
-            body.material_idx = particle["material_idx"]
-            body.move([
-                        particle["cx"] / self.dipole_size,
-                        particle["cy"] / self.dipole_size,
-                        particle["cz"] / self.dipole_size]
-                    )
+            body.material_idx = material_idx
+            body.move(center)
+            if dipoles is not None:
+                body.dipoles = load_dipoles(dipoles)
             self.bodies.append(body)
-            if particle["material_idx"] == 1 and not plas_recorded:
-                self.materials["plasmonic"] =  particle["material"],
+            if material_idx == 1 and not plas_recorded:
+                self.materials["plasmonic"] = material
                 plas_recorded = True
-            if particle["material_idx"] == 2 and not diel_recorded:
-                self.materials["dielectric"] = particle["material"]
+            if material_idx == 2 and not diel_recorded:
+                self.materials["dielectric"] = material
                 diel_recorded = True
-        cur.close(), conn.close()
+        cur.close()
         return self
            
-    def generate_cloud(self, system, materials, option="c2e"):
+    def generate_cloud(self, system, materials, option="c2e", parallel=True):
         """
         Generate a new particle cloud.
 
@@ -130,6 +554,10 @@ class CloudGenerator:
             to material identifiers.
         option : {'c2e', 'v2e'}, default='c2e'
             Placement strategy.
+        parallel : bool, default=True
+            Fill large ``'c2e'`` grids in a process pool. Pass ``False``
+            when already running in a worker process, so pools are not
+            nested.
 
         Returns
         -------
@@ -150,9 +578,10 @@ class CloudGenerator:
             The domain is tiled with cubic cells of edge length ``L`` chosen so
             that an integer pair of particle counts ``(N_plas, N_diel)`` within a
             single cell approximates the target volume‑fraction ratio. For each
-            lattice cell all required particles are placed uniformly at random
-            (with rejection to avoid overlaps) inside the cell bounds. After all
-            cells are processed, only bodies whose geometric center lies within
+            lattice cell that can reach the kept sphere all required particles
+            are placed uniformly at random (with rejection to avoid overlaps)
+            inside the cell bounds, see :func:`_fill_cell`; large grids are
+            filled in a process pool. After all cells are processed, only bodies whose geometric center lies within
             ``cloud_radius`` of the origin are retained.
 
             Early termination occurs if any particle exceeds 500 failed placement
@@ -163,72 +592,52 @@ class CloudGenerator:
             CloudGenerator
                 This instance with ``bodies`` populated.
             """
-            def pick_counts_and_cell_size(max_denom=20):
-                from fractions import Fraction
-                import math
-                # 1) target ratio
-                V1 = ShapeFactory.shape_selector(self.particle_data["plasmonic"]).volume
-                V2 = ShapeFactory.shape_selector(self.particle_data["dielectric"]).volume
-                phi1 = self.particle_data["plasmonic"]["volume_fraction"]
-                phi2 = self.particle_data["dielectric"]["volume_fraction"]
-                r = (phi1*V2) / (phi2*V1)
-
-                # 2) approximate r by N1/N2 with small denominators
-                frac = Fraction(r).limit_denominator(max_denom)
-                N1, N2 = frac.numerator, frac.denominator
-
-                # 3) compute exact V_cell to meet phi1
-                Vcell = (N1 * V1) / phi1         # in dipole‑volume units
-                
-                # 4) edge length in dipole units
-                L = math.ceil(Vcell ** (1/3))
-
-                return N1, N2, L
+            # one configured body per material; placements clone it
+            prototypes = {}
+            for mat_type, particle in self.particle_data.items():
+                prototype = ShapeFactory.shape_selector(particle)
+                prototype.material     = particle["material"]
+                prototype.material_idx = particle["material_idx"]
+                prototypes[mat_type] = prototype
 
             container_bodies = [] 
-            N_plas, N_diel, cell_size = pick_counts_and_cell_size()
+            N_plas, N_diel, cell_size = _pick_counts_and_cell_size(
+                prototypes["plasmonic"].volume,
+                prototypes["dielectric"].volume,
+                self.particle_data["plasmonic"]["volume_fraction"],
+                self.particle_data["dielectric"]["volume_fraction"],
+            )
             
-            for x in np.arange(-self.cloud_radius, self.cloud_radius + cell_size, cell_size):
-                for y in np.arange(-self.cloud_radius, self.cloud_radius + cell_size, cell_size):
-                    for z in np.arange(-self.cloud_radius, self.cloud_radius + cell_size, cell_size):
-                        cell_position = np.array([x, y, z])
-                        cell_bodies = []
-                        for idx in range(N_plas + N_diel):
-                            trials = 0
-                            is_placed = False
-                            mat_type = ("plasmonic" if (idx < N_plas) else "dielectric")
-                            body = ShapeFactory.shape_selector(self.particle_data[mat_type])
-                            body.material     = self.particle_data[mat_type]["material"]
-                            body.material_idx = self.particle_data[mat_type]["material_idx"]
-                            while not is_placed:
-                                is_colliding = False
-                                body_min = np.array([-cell_size / 2, -cell_size / 2, -cell_size / 2]) - np.min(body.center, axis=0)
-                                body_max = np.array([cell_size / 2, cell_size / 2, cell_size / 2]) - np.max(body.center, axis=0)
-                                particle_position = cell_position + np.random.uniform(body_min, body_max)
-                                for old_body in cell_bodies:
-                                    if (
-                                        self.calculator.calculate_center_distance(
-                                            body.center + particle_position, old_body.center
-                                        )
-                                        < body.radius + old_body.radius + 1
-                                    ):
-                                        is_colliding = True
-                                        trials += 1
-                                        if trials > 500:
-                                            return
-                                        break
-                                if not is_colliding:
-                                    body.move(particle_position)
-                                    cell_bodies.append(body)
-                                    is_placed = True
-                        container_bodies.extend(cell_bodies)
-            for body in container_bodies:
-                if body.shape == "sphere":
-                    center_point = body.center
-                else:
-                    center_point = np.mean(body.center, axis=0)
-                if np.linalg.norm(center_point) < self.cloud_radius:
-                    self.bodies.append(body)
+            # integer cell indices around the origin; a cell whose center is
+            # farther than cloud_radius plus its full diagonal cannot hold a
+            # body that survives the final radius filter, so it is skipped
+            nc = int(self.cloud_radius // cell_size) + 1
+            keep_radius2 = (self.cloud_radius + math.sqrt(3) * cell_size) ** 2
+            cells = [
+                np.array([i, j, k]) * cell_size
+                for i in range(-nc, nc + 1)
+                for j in range(-nc, nc + 1)
+                for k in range(-nc, nc + 1)
+                if (i*i + j*j + k*k) * cell_size * cell_size <= keep_radius2
+            ]
+            # cells never see each other's bodies, so each is filled
+            # independently from its own child generator; the result does
+            # not depend on how cells are spread over processes
+            seeds = self.rng.spawn(len(cells))
+            fill = partial(_fill_cell, prototypes=prototypes, n_plas=N_plas, n_diel=N_diel, cell_size=cell_size)
+            if parallel and len(cells) >= _PARALLEL_CELLS:
+                workers = os.cpu_count() or 1
+                chunksize = max(1, len(cells) // (4 * workers))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    filled = list(pool.map(fill, cells, seeds, chunksize=chunksize))
+            else:
+                filled = list(map(fill, cells, seeds))
+            for cell_bodies in filled:
+                if cell_bodies is None:
+                    return
+                container_bodies.extend(cell_bodies)
+            keep = _inside_cloud(container_bodies, self.cloud_radius)
+            self.bodies.extend(body for body, inside in zip(container_bodies, keep) if inside)
             return self
     
         def volume_to_ensemble():
@@ -257,57 +666,45 @@ class CloudGenerator:
 
             volume = 0
             collection_bodies = []
+            # a rod reaches height/2 from its midpoint, a sphere its radius
+            max_extent = max(
+                particle["params"][1] / 2 if particle["shape"] == "rod" else particle["params"][0]
+                for particle in self.particle_data.values()
+            )
+            grid = _BodyGrid(2 * max_extent + self.dipole_size + 1)
+            samples = _ball_samples(self.rng, 2 * self.cloud_radius)
             for _, particle in self.particle_data.items():
                 par_vol = 0
                 target_vol = 4 * np.pi / 3 * (2 * self.cloud_radius)**3 * particle["volume_fraction"]
+                prototype = ShapeFactory.shape_selector(particle)
+                prototype.material_idx = particle["material_idx"]
+                prototype.material = particle["material"]
+                body_volume = prototype.volume
+                distance_to = {shape: self.calculator.distance_kernel(prototype.shape, shape)
+                               for shape in ("sphere", "rod")}
                 while par_vol < target_vol:
-                    trials = 0
-                    is_placed = False
-                    body = ShapeFactory.shape_selector(particle)
-                    while not is_placed:
-                        phi       = np.random.uniform(0, 2*np.pi)
-                        cos_theta = np.random.uniform(-1, 1)
-                        sin_theta = np.sqrt(1 - cos_theta**2)
-                        direction = np.array([
-                            sin_theta * np.cos(phi),
-                            sin_theta * np.sin(phi),
-                            cos_theta
-                        ])
-
-                        # pick r so that the CDF ~ r³ (this yields a uniform volume density)
-                        u = np.random.random()               # in [0,1]
-                        r = (u ** (1/3)) * (2 * self.cloud_radius)
-
-                        particle_position = direction * r
-                        is_colliding = False
-                        for old_body in collection_bodies:
-                            if (
-                                self.calculator.calculate_center_distance(
-                                    body.center + particle_position, old_body.center
-                                )
-                                < body.radius + old_body.radius + self.dipole_size + 1
-                            ):
-                                trials += 1
-                                is_colliding = True
-                                break
-                        if trials > 500:
-                            return
-                        if not is_colliding:
-                            body.move(particle_position)
-                            body.material_idx = particle["material_idx"]
-                            body.material = particle["material"]
-                            collection_bodies.append(body)
-                            par_vol += body.volume
-                            is_placed = True
+                    if prototype.shape == "rod":
+                        body = prototype.clone(rotation=self.rng.uniform(0, 360, size=3).tolist())
+                    else:
+                        body = prototype.clone()
+                    particle_position = _place_in_ball(
+                        body, grid, distance_to, samples, self.dipole_size + 1
+                    )
+                    if particle_position is None:
+                        return
+                    body.move(particle_position)
+                    collection_bodies.append(body)
+                    grid.add(body, particle_position)
+                    par_vol += body_volume
 
                 volume += par_vol
-            for body in collection_bodies:
-                if self.calculator.calculate_center_distance(body.center, np.array([0, 0, 0])) < self.cloud_radius:
-                    self.bodies.append(body)
+            keep = _inside_cloud(collection_bodies, self.cloud_radius, rod_segment=True)
+            self.bodies.extend(body for body, inside in zip(collection_bodies, keep) if inside)
             return self
         
         self.option = option
         self.bodies = []
+        self._clear_geometry_cache()
         if option == "c2e":
             return cell_to_ensemble()
         elif option == "v2e":
@@ -319,14 +716,17 @@ class CloudGenerator:
 
         Returns
         -------
-        list[numpy.ndarray]
-            List of unique integer dipole positions aggregated across
-            shapes.
+        numpy.ndarray, shape (M, 3), dtype int32
+            Unique integer dipole positions over all bodies; lattice sites
+            shared by overlapping bodies appear once.
         """
-        self.dipoles = []
-        for body in self.bodies:
-            body.discretize()
-            self.dipoles.extend(np.unique(np.round(body.dipoles), axis=0))
+        if not self.bodies:
+            self.dipoles = np.empty((0, 3), dtype=np.int32)
+            return self.dipoles
+        # one packed‑key sort over every body instead of one per body
+        self.dipoles = unique_lattice(
+            np.concatenate([body.discretize() for body in self.bodies]).reshape(-1, 3)
+        )
         return self.dipoles
         
     def calculate_distribution(self):
@@ -341,16 +741,7 @@ class CloudGenerator:
         numpy.ndarray, shape (20,)
             Counts per distance bin.
         """
-        num_particles = len(self.bodies)
-        step = 2 * self.cloud_radius / 20
-        d_hist = np.zeros(20)
-        for i in range(num_particles):
-            par1 = self.bodies[i].center
-            for j in range(i + 1, num_particles):
-                par2 = self.bodies[j].center
-                dist = self.calculator.calculate_center_distance(par1, par2)
-                index = int(np.floor(dist / step))
-                if 0 <= index < len(d_hist):
-                    d_hist[index] += 1
-        return d_hist
+        return self.calculator.center_distance_histogram(
+            self.spheres_xyz, self.rod_ends, 2 * self.cloud_radius, 20
+        )
 
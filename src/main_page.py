@@ -9,18 +9,18 @@ MainWindow
     based on persisted configuration state.
 """
 
-import run_page, store_page, setup_page
+import setup_page
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget
 import sys
-from PyQt5.QtCore import Qt, QSettings, QDir
-from PyQt5.QtSql import QSqlDatabase
+from PyQt5.QtCore import Qt, QDir
+import settings_cache
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
 
 class MainWindow(QMainWindow):
     """
     Primary window hosting the application workflow.
 
-    On construction a shared SQLite connection (named ``ens_conn``) is
-    opened and three tabs are created:
+    Three tabs are created:
 
     * **Generate New Ensembles** – user input form for creating ensembles.
     * **Old Ensembles** – table/visualization of previously stored ensembles.
@@ -29,17 +29,19 @@ class MainWindow(QMainWindow):
     The first two tabs remain disabled until all required directories
     (output, DDSCAT, materials) exist. Whenever the setup page emits
     ``settingsSaved`` the tab lock state is recomputed.
+
+    Until then they hold empty placeholders: the shared SQLite connection
+    (named ``ens_conn``) and the run/store pages are only created the
+    first time the tabs are enabled, so a fresh install starts straight
+    into setup without touching the database.
     """
     def __init__(self):
         super().__init__()
-        settings = QSettings("LogicLorenzo", "PTTool")
         self.setWindowTitle("Cloud Generation Tool")
         self.resize(1000, 600)
-
-        self.db = QSqlDatabase.addDatabase("QSQLITE", "ens_conn")
-        self.db.setDatabaseName("ensembles.db")
-        if not self.db.open():
-            raise RuntimeError(self.db.lastError().text())
+        self.db = None
+        self.run_page = None
+        self.store_page = None
 
         # Create a central widget and set the layout
         central_widget = QWidget()
@@ -50,12 +52,10 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
-        # Add tabs for each page
+        # Add tabs for each page; the first two are built on demand
         self.setup_page = setup_page.SettingsWindow()
-        self.run_page = run_page.ParameterWindow()
-        self.store_page = store_page.EnsembleListWindow()
-        self.tabs.addTab(self.run_page, "Generate New Ensembles")
-        self.tabs.addTab(self.store_page, "Old Ensembles")
+        self.tabs.addTab(QWidget(), "Generate New Ensembles")
+        self.tabs.addTab(QWidget(), "Old Ensembles")
         self.tabs.addTab(self.setup_page, "Setup Program")
         self.setup_page.settingsSaved.connect(self.update_tab_lock)
         self.update_tab_lock()
@@ -65,18 +65,19 @@ class MainWindow(QMainWindow):
         Enable or disable tabs based on configured directory paths.
 
         Reads ``outputDir``, ``DDSCATDir``, and ``materialDir`` from
-        ``QSettings``. If all exist, the generation/storage tabs are
+        :mod:`settings_cache`. If all exist, the generation/storage tabs are
         enabled and the first tab is shown; otherwise only the setup tab
-        is accessible.
+        is accessible. The first time the tabs become available the real
+        pages are swapped in via :meth:`build_pages`.
         """
-        settings = QSettings("LogicLorenzo", "PTTool")
-        output_dir = settings.value("outputDir", "", type=str)
+        paths = settings_cache.all_paths()
+        output_dir = paths["outputDir"]
         has_output = bool(output_dir and QDir(output_dir).exists())
         
-        dds_dir = settings.value("DDSCATDir", "", type=str)
+        dds_dir = paths["DDSCATDir"]
         has_dds = bool(dds_dir and QDir(dds_dir).exists())
         
-        mat_dir = settings.value("materialDir", "", type=str)
+        mat_dir = paths["materialDir"]
         has_mat = bool(mat_dir and QDir(mat_dir).exists())
 
         has_all = has_output and has_dds and has_mat
@@ -85,10 +86,68 @@ class MainWindow(QMainWindow):
             self.tabs.setTabEnabled(i, has_all)
         # choose the page to show
         if has_all:
+            self.build_pages()
+            self._follow_output_dir()
             self.tabs.setCurrentIndex(0)
         else:
             self.tabs.setCurrentIndex(2)
 
+    def build_pages(self):
+        """
+        Open ``ens_conn`` and replace the placeholder tabs with the run
+        and store pages; does nothing once they exist.
+        """
+        if self.run_page is not None:
+            return
+        # deferred so that startup does not pay for the page modules
+        # (and their pyvista imports) until they are needed
+        import run_page, store_page
+
+        # the Qt side's one handle, on the same file every Storer writes
+        self.db = QSqlDatabase.addDatabase("QSQLITE", "ens_conn")
+        self._open_db()
+
+        self.run_page = run_page.ParameterWindow()
+        self.store_page = store_page.EnsembleListWindow()
+        for index, (page, title) in enumerate((
+            (self.run_page, "Generate New Ensembles"),
+            (self.store_page, "Old Ensembles"),
+        )):
+            placeholder = self.tabs.widget(index)
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, page, title)
+            placeholder.deleteLater()
+
+    def _open_db(self):
+        """Open ``ens_conn`` on the configured database file."""
+        from Storer import PRAGMAS, database_path
+
+        self.db.setDatabaseName(database_path())
+        if not self.db.open():
+            raise RuntimeError(self.db.lastError().text())
+        # same tuning as the sqlite3 connections, so the table views read
+        # from WAL without waiting on writers
+        query = QSqlQuery(self.db)
+        for pragma in PRAGMAS:
+            query.exec_(pragma)
+        query.finish()
+
+    def _follow_output_dir(self):
+        """
+        Re‑open ``ens_conn`` after ``outputDir`` has moved.
+
+        ``Storer.shared_connection`` is keyed on the database path, so the
+        writers follow a new ``outputDir`` on their own; the views are
+        pointed at the same file here and reloaded.
+        """
+        from Storer import database_path
+
+        if self.db.databaseName() == database_path():
+            return
+        self.db.close()
+        self._open_db()
+        self.store_page.reload()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     main_window = MainWindow()
@@ -14,24 +14,63 @@ ParameterWindow
     selected computations.
 """
 
-import sys, os
+import sys, os, math, multiprocessing
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QFormLayout, QLineEdit, QLabel, 
-    QPushButton, QGroupBox, QComboBox, QHBoxLayout, QCheckBox, QStackedLayout
+    QPushButton, QGroupBox, QComboBox, QHBoxLayout, QCheckBox, QStackedLayout,
+    QMessageBox
 )
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import pyqtSignal
 from generate_ensemble import CloudGenerator
 from Storer import Storer
 from Runner import Runner
-from Executer import Executer
-                
+from Executer import Executer, OMP_THREADS
+from Calculator import Calculator
+from solver_process import start_solver
+import settings_cache
+
+def _is_positive_number(text):
+    """Whether a form field holds a finite number greater than zero."""
+    try:
+        value = float(text)
+    except ValueError:
+        return False
+    return math.isfinite(value) and value > 0
+
+
+def _generate_cloud(ensemble_data, materials, option, with_data):
+    """
+    Generate and discretize one cloud in a worker process.
+
+    Module level so it can be pickled. The worker is already one of a
+    pool, so the cloud does not start a pool of its own; its lattices and,
+    if ``with_data``, its histograms are computed here so the GUI thread
+    only has to store and write them.
+
+    Returns
+    -------
+    tuple(CloudGenerator or None, dict or None)
+        The cloud (``None`` if placement gave up) and its
+        :meth:`Calculator.evaluate_distribution` result.
+    """
+    cloud = CloudGenerator().generate_cloud(ensemble_data, materials, option=option, parallel=False)
+    if cloud is None:
+        return None, None
+    for body in cloud.bodies:
+        body.discretize()
+    distributions = Calculator.evaluate_distribution(cloud) if with_data else None
+    return cloud, distributions
+
     
 class ObjectInputForm(QGroupBox):
     """
     Shape‑aware input form for a single material type.
 
     Presents a combo box to choose between *Sphere* and *Rod* and swaps
-    the active page accordingly. The accessor :meth:`get_data` returns a
+    the active page accordingly; the rod page is built on first use. The accessor :meth:`get_data` returns a
     dictionary containing the shape, physical parameters normalized by
     dipole size, volume fraction, material name, and the supplied
     material index.
@@ -62,21 +101,11 @@ class ObjectInputForm(QGroupBox):
         layout1.addWidget(self.sphere_volume_fraction)
         layout1.addWidget(self.sphere_material_input)
 
-        page2 = QWidget()
-        layout2 = QVBoxLayout(page2)
-        self.rod_length_input = QLineEdit(); self.rod_length_input.setPlaceholderText("Enter length (in nm)")
-        self.rod_radius_input = QLineEdit(); self.rod_radius_input.setPlaceholderText("Enter radius (in nm)")
-        self.rod_volume_fraction = QLineEdit(); self.rod_volume_fraction.setPlaceholderText("Enter volume fraction (0-1)")
-        self.rod_material_input = QLineEdit(); self.rod_material_input.setPlaceholderText("Enter material")
-        layout2.addWidget(self.rod_radius_input)
-        layout2.addWidget(self.rod_length_input)
-        layout2.addWidget(self.rod_volume_fraction)
-        layout2.addWidget(self.rod_material_input)
-        
+        # the rod page is only built once it is first selected
+        self.rod_page = None
         
         # 4️⃣ Add pages to the stack (order matters!)
-        for page in (page1, page2):
-            self.stacked.addWidget(page)
+        self.stacked.addWidget(page1)
 
         # 5️⃣ Lay everything out
         main_layout = QVBoxLayout(self)
@@ -92,8 +121,47 @@ class ObjectInputForm(QGroupBox):
         index : int
             Index from the shape selector combo box (0 = sphere, 1 = rod).
         """
+        if index == 1 and self.rod_page is None:
+            self._build_rod_page()
         self.stacked.setCurrentIndex(index)
 
+    def _build_rod_page(self):
+        """Create the rod input fields and append them as stack page 1."""
+        page2 = QWidget()
+        layout2 = QVBoxLayout(page2)
+        self.rod_length_input = QLineEdit(); self.rod_length_input.setPlaceholderText("Enter length (in nm)")
+        self.rod_radius_input = QLineEdit(); self.rod_radius_input.setPlaceholderText("Enter radius (in nm)")
+        self.rod_volume_fraction = QLineEdit(); self.rod_volume_fraction.setPlaceholderText("Enter volume fraction (0-1)")
+        self.rod_material_input = QLineEdit(); self.rod_material_input.setPlaceholderText("Enter material")
+        layout2.addWidget(self.rod_radius_input)
+        layout2.addWidget(self.rod_length_input)
+        layout2.addWidget(self.rod_volume_fraction)
+        layout2.addWidget(self.rod_material_input)
+        self.stacked.addWidget(page2)
+        self.rod_page = page2
+
+    def numeric_fields(self):
+        """
+        Numeric inputs of the active shape page.
+
+        Returns
+        -------
+        list[tuple(QLineEdit, str)]
+            Each widget with a human‑readable name for error messages.
+        """
+        if self.shape_parameter.currentIndex() == 0:
+            return [
+                (self.sphere_radius_input, f"{self.type} sphere radius"),
+                (self.sphere_volume_fraction, f"{self.type} volume fraction"),
+            ]
+        if self.rod_page is None:
+            return []
+        return [
+            (self.rod_radius_input, f"{self.type} rod radius"),
+            (self.rod_length_input, f"{self.type} rod length"),
+            (self.rod_volume_fraction, f"{self.type} volume fraction"),
+        ]
+
     def get_data(self, dipole_size, material_idx):
         """
         Extract current form values as a serializable dictionary.
@@ -115,6 +183,12 @@ class ObjectInputForm(QGroupBox):
             Dictionary with keys: ``shape``, ``params`` (list),
             ``volume_fraction``, ``material`` (string name), and
             ``material_idx``.
+
+        Raises
+        ------
+        ValueError
+            If a numeric field does not parse, or the rod page was never
+            opened.
         """
         idx = self.shape_parameter.currentIndex()
         if idx == 0:  # Sphere
@@ -129,6 +203,8 @@ class ObjectInputForm(QGroupBox):
                     "material_idx": material_idx
                 }
         else:         # Rod
+            if self.rod_page is None:
+                raise ValueError(f"{self.type}: the rod parameters have not been entered")
             r   = float(self.rod_radius_input.text()) / dipole_size
             L   = float(self.rod_length_input.text()) / dipole_size
             vf  = float(self.rod_volume_fraction.text())
@@ -154,16 +230,28 @@ class ParameterWindow(QWidget):
     :class:`Runner` and :class:`Executer` methods.
 
     Environment paths (output, DDSCAT, materials) are loaded from
-    ``QSettings`` on construction.
+    :mod:`settings_cache` on construction.
     """
+    # a finished generation future, re‑emitted on the GUI thread
+    cloudDone = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
-        settings     = QSettings("LogicLorenzo", "PTTool")
-        self.paths = {
-            "outputDir": settings.value("outputDir", "", type=str),
-            "DDSCATDir": settings.value("DDSCATDir", "", type=str),
-            "materialDir": settings.value("materialDir", "", type=str)
-        }
+        self.paths = settings_cache.all_paths()
+        # solver processes: queued (executer, run DDA, run postprocessing)
+        # entries, and how many are currently running
+        self._queue = deque()
+        self._running = 0
+        self._max_running = max(1, (os.cpu_count() or 1) // OMP_THREADS)
+        self._storer = None
+        # cloud generation in flight: the pool, the number of clouds still
+        # outstanding, the reasons of failed ones and the settings the
+        # arriving clouds are processed with
+        self._pool = None
+        self._generating = 0
+        self._failures = []
+        self._run = None
+        self.cloudDone.connect(self._cloud_done)
         self.setWindowTitle("Object Parameter Input")
         self.setGeometry(100, 100, 400, 500)
         layout = QVBoxLayout()
@@ -212,17 +300,51 @@ class ParameterWindow(QWidget):
         """
         Generate one or more ensembles and execute selected tasks.
 
-        Reads all user inputs, constructs the configuration dictionary
+        Reads all user inputs (a warning listing every invalid numeric
+        field is shown and nothing runs if one is not a positive number), constructs the configuration dictionary
         passed to :meth:`CloudGenerator.generate_cloud`, persists each
         ensemble, and executes ensemble data generation, DDA, and/or
         post‑processing based on the state of the corresponding checkboxes.
         Database status flags are updated after each successful task.
+
+        Clouds are independent, so they are generated in a process pool;
+        the method returns at once and each cloud is handled on this
+        thread by :meth:`_cloud_done` as it arrives, so database writes
+        stay on a single thread. Failed generations are reported in one
+        dialog at the end, and the Run button is disabled until then.
+        DDSCAT and ddpostprocess
+        then run as ``QProcess`` children, so the method returns and the
+        GUI stays responsive while they work; their flags are set from the
+        ``finished`` signal. At most one solver per ``OMP_THREADS`` cores
+        is kept in flight.
         """
-        dipole_size = float(self.dipole_input.text()) if hasattr(self, 'dipole_input') else 1
-        ensemble_size = float(self.ensemble_size.text()) if hasattr(self, 'ensemble_size') else 25
-        
-        plasmonic_data = self.PNS.get_data(dipole_size, 1)
-        dielectric_data = self.DNR.get_data(dipole_size, 2)
+        # all numeric fields are checked in one sweep so every bad entry
+        # is reported together and nothing is converted before that
+        fields = [
+            (self.ensemble_size, "ensemble size"),
+            (self.dipole_input, "dipole size"),
+            (self.number_ensembles, "number of ensembles"),
+            (self.wavelength, "wavelength"),
+            *self.PNS.numeric_fields(),
+            *self.DNR.numeric_fields(),
+        ]
+        bad = [name for widget, name in fields if not _is_positive_number(widget.text())]
+        if bad:
+            QMessageBox.warning(self, "Invalid input", "Please enter a positive number for: " + ", ".join(bad))
+            return
+
+        # every field is parsed once, up front; the forms are not read
+        # again while ensembles are processed
+        try:
+            dipole_size = float(self.dipole_input.text())
+            ensemble_size = float(self.ensemble_size.text())
+            wavelength = float(self.wavelength.text())
+            num_ensembles = int(self.number_ensembles.text())
+            plasmonic_data = self.PNS.get_data(dipole_size, 1)
+            dielectric_data = self.DNR.get_data(dipole_size, 2)
+        except ValueError as err:
+            QMessageBox.warning(self, "Invalid input", str(err))
+            return
         plasmonic_data["type"] = "plasmonic"
         dielectric_data["type"] = "dielectric"
         ensembe_type = "c2e" if self.ensemble_type.currentText() == "Cell-to-Ensemble" else "v2e"
@@ -230,31 +352,144 @@ class ParameterWindow(QWidget):
                     "cloud_radius": ensemble_size / dipole_size, 
                     "dipole_size": dipole_size}
         materials = {"plasmonic": plasmonic_data["material"], "dielectric": dielectric_data["material"]}
-        wavelength = float(self.wavelength.text()) if hasattr(self, 'wavelength') else 800
-        num_ensembles = int(self.number_ensembles.text()) if hasattr(self, 'number_ensembles') else 1
+        workers = max(1, min(num_ensembles, os.cpu_count() or 1))
+        # one database connection for the whole run, kept until the last
+        # solver finishes; every ensemble is still committed as soon as it
+        # is stored, so the store page sees it (and its flags) while long
+        # solver runs are in progress
+        if self._storer is None:
+            self._storer = Storer()
+        # the shared parent is created once; each ensemble then only
+        # creates its own directory
+        # re‑read, since outputDir may have changed on the setup page
+        self.paths = settings_cache.all_paths()
+        ensembles_root = Path(self.paths["outputDir"]) / "ensembles"
+        ensembles_root.mkdir(parents=True, exist_ok=True)
+        # the options are captured now, so toggling a checkbox while the
+        # clouds are generated or solved does not change what they get
+        with_data = self.ensemble_data_checkbox.isChecked()
+        self._run = (
+            wavelength, ensembles_root, with_data,
+            self.dda_checkbox.isChecked(), self.ddpost_checkbox.isChecked(),
+        )
+        self._generating = num_ensembles
+        self._failures = []
+        self.run_button.setEnabled(False)
+        # spawned, not forked: a fork of the running Qt application is unsafe
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
         for _ in range(num_ensembles):
-            storer = Storer()
-            ensemble = CloudGenerator().generate_cloud(ensemble_data, materials, option=ensembe_type)
-            ensemble.ensemble_id = storer.store_new_ensemble(ensemble)
-            
-            runner = Runner(ensemble)
-            executer = Executer(ensemble, wavelength=wavelength)
-            print(f"'{ensemble.ensemble_id}'")
-
-            ensemble_dir = os.path.join(self.paths["outputDir"], "ensembles", ensemble.ensemble_id)
-            os.makedirs(ensemble_dir, exist_ok=True)
-
-            if self.ensemble_data_checkbox.isChecked():
-                runner.generate_ensemble_data()
-                storer.update_ensembe_info(ensemble.ensemble_id, "ensemble_data")
-
-            if self.dda_checkbox.isChecked():
-                executer.run_ddscat()
-                storer.update_ensembe_info(ensemble.ensemble_id, "ddscat_run")
-
-            if self.ddpost_checkbox.isChecked():
-                executer.run_ddpostprocess()
-                storer.update_ensembe_info(ensemble.ensemble_id, "postprocessing_run")
+            future = self._pool.submit(_generate_cloud, ensemble_data, materials, ensembe_type, with_data)
+            # the callback runs on a pool thread; the signal hands the
+            # future over to the GUI thread
+            future.add_done_callback(self.cloudDone.emit)
+
+    def _cloud_done(self, future):
+        """Process one generated cloud; wrap up once the last has arrived."""
+        self._generating -= 1
+        try:
+            ensemble, distributions = future.result()
+            if ensemble is None:
+                self._failures.append("gave up after too many failed placements")
+            else:
+                self._process_ensemble(ensemble, distributions, *self._run)
+        except Exception as err:
+            # a failed cloud, or a failed store, must not stall the rest
+            self._failures.append(f"{type(err).__name__}: {err}")
+        if not self._generating:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+            self.run_button.setEnabled(True)
+        self._start_solvers()
+        if not self._generating and self._failures:
+            QMessageBox.warning(
+                self, "Ensemble generation failed",
+                f"{len(self._failures)} ensemble(s) could not be generated:\n" + "\n".join(self._failures),
+            )
+
+    def _process_ensemble(self, ensemble, distributions, wavelength, ensembles_root, ensemble_data, dda, post):
+        """
+        Store a generated ensemble, write its data and queue its solvers.
+
+        Parameters
+        ----------
+        ensemble : CloudGenerator
+            Freshly generated cloud.
+        distributions : dict or None
+            Its histograms, computed by the worker when ``ensemble_data``
+            is set.
+        wavelength : float
+            Illumination wavelength in nanometers.
+        ensembles_root : pathlib.Path
+            Existing ``<outputDir>/ensembles`` directory.
+        ensemble_data, dda, post : bool
+            Whether to build the ensemble data and run DDSCAT and
+            ddpostprocess.
+        """
+        storer = self._storer
+        ensemble.ensemble_id = storer.store_new_ensemble(ensemble)
+
+        ensemble_dir = ensembles_root / ensemble.ensemble_id
+        ensemble_dir.mkdir(exist_ok=True)
+        runner = Runner(ensemble, storer, target=ensemble_dir)
+        executer = Executer(ensemble, wavelength=wavelength, target=str(ensemble_dir))
+        print(f"'{ensemble.ensemble_id}'")
+
+        if ensemble_data:
+            # flags ensemble_data itself
+            runner.generate_ensemble_data(distributions=distributions)
+
+        if dda or post:
+            self._queue.append((executer, dda, post))
+
+    def _start_solvers(self):
+        """
+        Start queued solver runs while fewer than the allowed number of
+        processes are active; release the database once generation and
+        all solvers are done.
+        """
+        while self._queue and self._running < self._max_running:
+            executer, dda, post = self._queue.popleft()
+            if dda:
+                self._start_process(executer, executer.ddscat_command(), "ddscat_run", post)
+            else:
+                self._start_process(executer, executer.ddpostprocess_command(), "postprocessing_run")
+        if not (self._queue or self._running or self._generating) and self._storer is not None:
+            self._storer.close()
+            self._storer = None
+
+    def _start_process(self, executer, command, flag, then_post=False):
+        """
+        Run an external solver with ``QProcess`` without blocking the GUI.
+
+        Parameters
+        ----------
+        executer : Executer
+            Executer of the ensemble being solved.
+        command : tuple(str, list[str], str)
+            Executable, arguments and working directory.
+        flag : str
+            Database flag set when the process exits successfully.
+        then_post : bool, default=False
+            Start ddpostprocess for the same ensemble afterwards.
+        """
+        self._running += 1
+        start_solver(self, command, lambda error: self._process_finished(executer, flag, then_post, error))
+
+    def _process_finished(self, executer, flag, then_post, error):
+        """
+        Flag a finished solver run, keep the queue moving and report a
+        failure (``error`` is ``None`` on success) to the user.
+        """
+        self._running -= 1
+        ensemble_id = executer.ensemble.ensemble_id
+        if error is None:
+            self._storer.update_ensembe_info(ensemble_id, flag)
+            if then_post:
+                # postprocessing reuses the slot its solver just freed
+                self._queue.appendleft((executer, False, True))
+        self._start_solvers()
+        if error is not None:
+            QMessageBox.warning(self, "Solver failed", f"'{ensemble_id}': {error}")
                 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""
+Process‑wide cache of the persisted application settings.
+
+Every page used to open its own ``QSettings("LogicLorenzo", "PTTool")``
+and read the configured directories on construction, which goes to the
+registry (Windows) or the INI file (macOS/Linux) each time. This module
+keeps one ``QSettings`` handle and an in‑memory copy of the values read
+through it; writes go through :func:`set` so the copy never goes stale.
+
+Functions
+---------
+get(key, default="")
+    Cached string value of ``key``.
+set(key, value)
+    Store ``value`` under ``key`` unless it is unchanged.
+all_paths()
+    The three configured directories as a new dict.
+"""
+
+from PyQt5.QtCore import QSettings
+
+# settings keys of the directories configured on the setup page
+PATH_KEYS = ("outputDir", "DDSCATDir", "materialDir")
+
+_qs = QSettings("LogicLorenzo", "PTTool")
+_cache = {}
+
+
+def get(key, default=""):
+    """
+    Return the stored value of ``key``, reading ``QSettings`` only once.
+
+    Parameters
+    ----------
+    key : str
+        Settings key.
+    default : str, default=""
+        Returned when nothing (or an empty string) is stored.
+
+    Returns
+    -------
+    str
+    """
+    if key not in _cache:
+        _cache[key] = _qs.value(key, "", type=str)
+    return _cache[key] or default
+
+
+def set(key, value):
+    """
+    Persist ``value`` under ``key`` and update the cache.
+
+    Parameters
+    ----------
+    key : str
+        Settings key.
+    value : str
+        New value.
+
+    Returns
+    -------
+    bool
+        ``False`` if the value was already stored and nothing was written.
+    """
+    if get(key) == value:
+        return False
+    _qs.setValue(key, value)
+    _cache[key] = value
+    return True
+
+
+def all_paths():
+    """
+    Return the configured directories.
+
+    Returns
+    -------
+    dict[str, str]
+        ``outputDir``, ``DDSCATDir`` and ``materialDir``; a fresh dict the
+        caller may modify.
+    """
+    return {key: get(key) for key in PATH_KEYS}
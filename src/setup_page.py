@@ -21,6 +21,8 @@ Design Notes
 * All persistent state is handled exclusively through ``QSettings`` using
   organization ``LogicLorenzo`` and application ``PTTool`` so these
   widgets can be dropped into any main window without additional glue.
+  Reads and writes go through :mod:`settings_cache`, so opening the
+  dialog does not go back to the registry / INI file.
 * The dialog stores references to each editable ``QLineEdit`` together
   with the corresponding settings key in ``self.rows`` to avoid parallel
   lists.
@@ -33,7 +35,8 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QDialog, QFileDialog
 )
-from PyQt5.QtCore import QSettings, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal
+import settings_cache
 
 class DirectoryDialog(QDialog):
     """Modal dialog to pick and persist required folder paths.
@@ -53,13 +56,22 @@ class DirectoryDialog(QDialog):
         self.resize(500, 200)
 
         # Load stored paths (or "" if not set)
-        settings     = QSettings("LogicLorenzo", "PTTool")
-        out_dir  = settings.value("outputDir",  "")
-        ddscat_dir = settings.value("DDSCATDir", "")
-        mat_dir = settings.value("materialDir",    "")
+        paths = settings_cache.all_paths()
+        # values as persisted when the dialog opened; accept() only
+        # writes the keys that differ from them
+        self._original = paths
+        out_dir  = paths["outputDir"]
+        ddscat_dir = paths["DDSCATDir"]
+        mat_dir = paths["materialDir"]
 
         layout = QVBoxLayout(self)
 
+        # one folder chooser shared by every Browse… button
+        self._chooser = QFileDialog(self)
+        self._chooser.setFileMode(QFileDialog.Directory)
+        self._chooser.setOption(QFileDialog.ShowDirsOnly, True)
+        self._last_dir = ""
+
         # helper to make a row of (label, edit, browse)
         def make_row(label_text, init_text, key):
             """Create one (label, line edit, browse button) row.
@@ -74,11 +86,7 @@ class DirectoryDialog(QDialog):
             lbl = QLabel(label_text)
             edit = QLineEdit(init_text)
             btn  = QPushButton("Browse…")
-            def on_browse():
-                d = QFileDialog.getExistingDirectory(self, f"Select {label_text}", edit.text())
-                if d:
-                    edit.setText(d)
-            btn.clicked.connect(on_browse)
+            btn.clicked.connect(lambda checked=False, edit=edit: self._open_chooser(edit, label_text))
             row.addWidget(lbl)
             row.addWidget(edit, 1)
             row.addWidget(btn)
@@ -100,16 +108,32 @@ class DirectoryDialog(QDialog):
         btns.addWidget(can)
         layout.addLayout(btns)
 
+    def _open_chooser(self, edit, label_text):
+        """Let the user pick a folder for ``edit`` with the shared chooser.
+
+        The chooser starts in the row's current folder, or in the last
+        folder picked in this dialog when the row is still empty.
+        """
+        self._chooser.setWindowTitle(f"Select {label_text}")
+        self._chooser.setDirectory(edit.text() or self._last_dir)
+        if self._chooser.exec_() == QDialog.Accepted:
+            selected = self._chooser.selectedFiles()
+            if selected:
+                edit.setText(selected[0])
+                self._last_dir = selected[0]
+
     def accept(self):
-        """Persist current edits into ``QSettings`` then close.
+        """Persist changed edits into ``QSettings`` then close.
 
         Overridden to ensure data is saved prior to emitting the standard
         ``accepted`` signal via ``super().accept()``.
         """
-        # save current edits back to QSettings
-        settings = QSettings("LogicLorenzo", "PTTool")
+        # save current edits back to QSettings; unchanged ones are skipped
+        # and nothing is synced explicitly, Qt flushes from the event loop
         for edit, key in self.rows:
-            settings.setValue(key, edit.text())
+            text = edit.text()
+            if text != self._original[key]:
+                settings_cache.set(key, text)
         super().accept()
 
     def get_paths(self):
@@ -125,8 +149,8 @@ class DirectoryDialog(QDialog):
 class SettingsWindow(QWidget):
     """Widget showing stored directory settings and allowing edits.
 
-    The window displays the three persisted directories in read‑only
-    ``QLineEdit`` widgets along with a *Change Folders…* button. When the
+    The window displays the three persisted directories in selectable
+    ``QLabel`` widgets along with a *Change Folders…* button. When the
     user clicks the button a :class:`DirectoryDialog` is shown. After the
     dialog closes (regardless of acceptance) the ``settingsSaved`` signal
     is emitted so other components (e.g., tab enablers) can refresh their
@@ -146,23 +170,25 @@ class SettingsWindow(QWidget):
         self.resize(400,300)
 
         # load the saved dirs so far
-        settings     = QSettings("LogicLorenzo", "PTTool")
-        self.output_dir  = settings.value("outputDir",  "")
-        self.ddscat_dir = settings.value("DDSCATDir", "")
-        self.mat_dir    = settings.value("materialDir",    "")
+        paths = settings_cache.all_paths()
+        self.output_dir  = paths["outputDir"]
+        self.ddscat_dir = paths["DDSCATDir"]
+        self.mat_dir    = paths["materialDir"]
 
         layout = QVBoxLayout(self)
 
-        # show them in read-only fields (optional)
-        self.out_edit  = QLineEdit(self.output_dir);  self.out_edit.setReadOnly(True)
-        self.ddscat_edit = QLineEdit(self.ddscat_dir); self.ddscat_edit.setReadOnly(True)
-        self.mat_edit = QLineEdit(self.mat_dir);    self.mat_edit.setReadOnly(True)
-        for lbl_text, edit in [("Output Directory:",self.out_edit),
-                               ("DDSCAT Directory:",self.ddscat_edit),
-                               ("Materials Directory:",   self.mat_edit)]:
+        # show them in selectable labels; nothing here is edited in place
+        self.out_label = QLabel(self.output_dir)
+        self.ddscat_label = QLabel(self.ddscat_dir)
+        self.mat_label = QLabel(self.mat_dir)
+        for label in (self.out_label, self.ddscat_label, self.mat_label):
+            label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        for lbl_text, value in [("Output Directory:",self.out_label),
+                               ("DDSCAT Directory:",self.ddscat_label),
+                               ("Materials Directory:",   self.mat_label)]:
             row = QHBoxLayout()
             row.addWidget(QLabel(lbl_text))
-            row.addWidget(edit, 1)
+            row.addWidget(value, 1)
             layout.addLayout(row)
 
         # Button to re-open the folder-picker at any time
@@ -176,7 +202,7 @@ class SettingsWindow(QWidget):
         """Open the directory dialog and update internal state.
 
         If the dialog is accepted the three path attributes and their
-        corresponding read‑only fields are updated. The ``settingsSaved``
+        corresponding labels are updated. The ``settingsSaved``
         signal is emitted unconditionally so any listener can decide how
         to handle cancellation vs. acceptance.
         """
@@ -185,9 +211,9 @@ class SettingsWindow(QWidget):
             # pull back the new paths
             self.output_dir, self.ddscat_dir, self.mat_dir = dlg.get_paths()
             # update display
-            self.out_edit.setText(self.output_dir)
-            self.ddscat_edit.setText(self.ddscat_dir)
-            self.mat_edit.setText(self.mat_dir)
+            self.out_label.setText(self.output_dir)
+            self.ddscat_label.setText(self.ddscat_dir)
+            self.mat_label.setText(self.mat_dir)
             # now any part of your app can use self.input_dir, etc.
         self.settingsSaved.emit()
 
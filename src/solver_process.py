@@ -0,0 +1,70 @@
+"""
+Non‑blocking launcher for the DDSCAT / ddpostprocess binaries.
+
+Both GUI pages run the solvers as ``QProcess`` children so the event loop
+keeps running while they work. This module holds the one launcher they
+share: it applies the OpenMP environment of :mod:`Executer` and folds the
+two ways a run can end (``finished``, or ``errorOccurred`` with
+``FailedToStart``, which is never followed by ``finished``) into a single
+callback.
+
+Functions
+---------
+start_solver(parent, command, on_done)
+    Start one solver and report its outcome exactly once.
+"""
+
+from PyQt5.QtCore import QProcess, QProcessEnvironment
+from Executer import OMP_ENV
+
+# QProcess copy of the solver environment, built once
+_ENV = QProcessEnvironment()
+for _key, _value in OMP_ENV.items():
+    _ENV.insert(_key, _value)
+
+
+def start_solver(parent, command, on_done):
+    """
+    Start an external solver without blocking the GUI.
+
+    Parameters
+    ----------
+    parent : QObject
+        Owner of the process; it must outlive the run.
+    command : tuple(str, list[str], str)
+        Executable, arguments and working directory, as returned by
+        :meth:`Executer.ddscat_command` / :meth:`Executer.ddpostprocess_command`.
+    on_done : callable
+        Called once on the GUI thread when the run has ended, with
+        ``None`` on success or a message describing the failure (could
+        not start, crashed, or non‑zero exit code).
+
+    Returns
+    -------
+    QProcess
+        The started process; it deletes itself after ``on_done``.
+    """
+    program, args, cwd = command
+    proc = QProcess(parent)
+    proc.setWorkingDirectory(cwd)
+    proc.setProcessEnvironment(_ENV)
+
+    def finished(code, status):
+        proc.deleteLater()
+        if status != QProcess.NormalExit:
+            on_done(f"{program} crashed")
+        elif code:
+            on_done(f"{program} exited with code {code}")
+        else:
+            on_done(None)
+
+    def error(kind):
+        # any other error of a started process is followed by finished
+        if kind == QProcess.FailedToStart:
+            proc.deleteLater()
+            on_done(f"could not start {program}: {proc.errorString()}")
+
+    proc.finished.connect(finished)
+    proc.errorOccurred.connect(error)
+    proc.start(program, args)
+    return proc
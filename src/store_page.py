@@ -15,20 +15,136 @@ ParticleListWindow
     a 3‑D visualization, and a multi‑select menu of pending calculations
     (ensemble data generation, DDA, post‑processing) that can be executed.
 """
-import sqlite3
+import os, sqlite3
+from functools import partial
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QTableView, QLabel, QHBoxLayout, 
-    QMenu, QListWidget, QListWidgetItem, QToolButton, QWidgetAction
+    QMenu, QListWidget, QListWidgetItem, QToolButton, QWidgetAction, QMessageBox
+)
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery, QSqlQueryModel, QSqlTableModel
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 )
-from PyQt5.QtSql import QSqlDatabase, QSqlTableModel
-from PyQt5.QtCore import Qt
 import pyvista as pv
 from pyvistaqt import QtInteractor
+from vtkmodules.vtkRenderingCore import vtkActor, vtkGlyph3DMapper
 from generate_ensemble import CloudGenerator
 from Storer import Storer
 from Runner import Runner
 from Executer import Executer
+from solver_process import start_solver
+
+# body colors by material_idx (plasmonic, dielectric) and the cloud boundary
+COLORS = ("#FFD700", "#ADD8E6")
+CLOUD_COLOR = "#786E6D8A"
+
+# tessellation of the instanced sphere (theta, phi) and cylinder templates;
+# pyvista's 30x30 sphere is far finer than a particle ever covers on screen
+SPHERE_RES = (12, 12)
+CYLINDER_RES = 16
+
+# dropdown label of each calculation -> its completion flag in ``ensembles``
+_OPTION_FLAGS = {
+    "Ensemble data": "ensemble_data",
+    "DDA": "ddscat_run",
+    "Postprocessing": "postprocessing_run",
+}
+
+# particle table of one ensemble; the dipole lattice BLOB is never shown
+_PARTICLES_QUERY = """SELECT ensemble_id, particle_idx, material_idx, material, shape, radius,
+    length, volume, cx, cy, cz, rx, ry, rz
+    FROM ensemble_particles WHERE ensemble_id = ? ORDER BY particle_idx"""
+
+
+class _RunSignals(QObject):
+    """Signals of :class:`_RunWorker`; a ``QRunnable`` cannot carry its own."""
+    done = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+
+
+class _RunWorker(QRunnable):
+    """
+    Run a blocking calculation on the global ``QThreadPool``.
+
+    Parameters
+    ----------
+    fn : callable
+        Work to do, called without arguments in a pool thread.
+    label : str
+        Emitted with :attr:`signals` ``done`` or ``failed`` (together with
+        the error message) so the receiving window knows which step ended.
+    """
+    def __init__(self, fn, label):
+        super().__init__()
+        self.fn = fn
+        self.label = label
+        self.signals = _RunSignals()
+
+    def run(self):
+        try:
+            self.fn()
+        except Exception as exc:
+            self.signals.failed.emit(self.label, str(exc))
+        else:
+            self.signals.done.emit(self.label)
+
+
+def _body_arrays(bodies):
+    """
+    Gather the drawing attributes of ``bodies`` into contiguous arrays.
+
+    Parameters
+    ----------
+    bodies : list
+        Sphere and rod bodies as built by :meth:`CloudGenerator.read_cloud`.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        ``sphere_centers`` (N, 3), ``sphere_radii`` and ``sphere_mat`` (N,);
+        ``rod_ends`` (M, 2, 3), ``rod_radii``, ``rod_heights`` and
+        ``rod_mat`` (M,).
+    """
+    spheres = [body for body in bodies if body.shape == "sphere"]
+    rods = [body for body in bodies if body.shape == "rod"]
+    return {
+        "sphere_centers": np.array([body.center for body in spheres], dtype=float).reshape(-1, 3),
+        "sphere_radii": np.fromiter((body.radius for body in spheres), float, len(spheres)),
+        "sphere_mat": np.fromiter((body.material_idx for body in spheres), int, len(spheres)),
+        "rod_ends": np.array([body.center for body in rods], dtype=float).reshape(-1, 2, 3),
+        "rod_radii": np.fromiter((body.radius for body in rods), float, len(rods)),
+        "rod_heights": np.fromiter((body.height for body in rods), float, len(rods)),
+        "rod_mat": np.fromiter((body.material_idx for body in rods), int, len(rods)),
+    }
+
+
+def _rod_transforms(ends, radii, heights):
+    """
+    Per‑instance placement of the unit cylinder for every rod.
+
+    Parameters
+    ----------
+    ends : numpy.ndarray, shape (M, 2, 3)
+        Centers of the two end caps of each rod.
+    radii, heights : numpy.ndarray, shape (M,)
+        Rod radii and total lengths including the caps.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        Midpoints (M, 3), axis vectors (M, 3) and scale factors (M, 3);
+        the unit cylinder lies along x, so the scale is the cylindrical
+        length followed by the radius twice.
+    """
+    midpoints = ends.sum(axis=1)
+    midpoints *= 0.5
+    axes = ends[:, 1] - ends[:, 0]
+    scales = np.empty((len(radii), 3))
+    np.subtract(heights, 2 * radii, out=scales[:, 0])
+    scales[:, 1] = radii
+    scales[:, 2] = radii
+    return midpoints, axes, scales
 
 
 class EnsembleView(QtInteractor):
@@ -36,7 +152,7 @@ class EnsembleView(QtInteractor):
     Embedded 3‑D viewer for an ensemble.
 
     Adds axes on construction and exposes :meth:`add_bodies` to populate
-    the scene with all particles belonging to a given ``ensemble_id``.
+    the scene with all particles of a loaded ensemble.
 
     Parameters
     ----------
@@ -47,43 +163,82 @@ class EnsembleView(QtInteractor):
         super().__init__(parent)
         self.add_axes()
 
-    def add_bodies(self, ensemble_id):
+    def add_bodies(self, cloud):
         """
         Populate the scene with all bodies for an ensemble.
 
-        Spheres are rendered as ``pv.Sphere`` objects. Rods are rendered
-        as a central ``pv.Cylinder`` plus two hemispherical caps to
-        approximate a spherocylinder. An enclosing transparent sphere
-        representing the cloud radius is also added. The camera is reset
-        after population.
+        Spheres are rendered as instances of one unit sphere. Rods are
+        rendered as instances of a unit cylinder plus two hemispherical
+        sphere caps to approximate a spherocylinder. Each material gets
+        one instanced actor per template (see :meth:`_add_glyphs`), so the
+        geometry is uploaded once and every body is only a per‑instance
+        transform. An enclosing transparent sphere representing the cloud
+        radius is also added. The camera is reset after population.
 
         Parameters
         ----------
-        ensemble_id : str
-            Identifier used by :class:`CloudGenerator` to reconstruct the
-            ensemble on disk.
+        cloud : CloudGenerator
+            Ensemble already loaded with :meth:`CloudGenerator.read_cloud`.
         """
-        # create a cylinder between p1 and p2
-        cloud = CloudGenerator()
-        cloud.read_cloud(ensemble_id)
-        for body in cloud.bodies:
-            colorlist = ["#FFD700", "#ADD8E6"]
-            if body.shape == "sphere":
-                sphere = pv.Sphere(center=body.center, radius=body.radius)
-                self.add_mesh(sphere, color= colorlist[body.material_idx - 1])
-            elif body.shape == "rod":
-                cylinder = pv.Cylinder(center=np.mean(body.center, axis=0),
-                                  direction=np.subtract(body.center[1], body.center[0]),
-                                  radius=body.radius, height=body.height - 2 * body.radius)
-                self.add_mesh(cylinder, color=colorlist[body.material_idx - 1])
-                cap1 = pv.Sphere(center=body.center[0], radius=body.radius)
-                self.add_mesh(cap1, color=colorlist[body.material_idx - 1])
-                cap2 = pv.Sphere(center=body.center[1], radius=body.radius)
-                self.add_mesh(cap2, color=colorlist[body.material_idx - 1])
+        arrays = _body_arrays(cloud.bodies)
+        rod_ends = arrays["rod_ends"]
+        rod_radii = arrays["rod_radii"]
+        midpoints, axes, scales = _rod_transforms(rod_ends, rod_radii, arrays["rod_heights"])
+        unit_sphere = pv.Sphere(radius=1, theta_resolution=SPHERE_RES[0], phi_resolution=SPHERE_RES[1])
+        unit_cylinder = pv.Cylinder(direction=(1, 0, 0), radius=1, height=1, resolution=CYLINDER_RES)
+        for material_idx in np.unique(np.concatenate((arrays["sphere_mat"], arrays["rod_mat"]))):
+            is_sphere = arrays["sphere_mat"] == material_idx
+            is_rod = arrays["rod_mat"] == material_idx
+            color = COLORS[material_idx - 1]
+            # rod caps share the sphere actor
+            centers = np.concatenate((arrays["sphere_centers"][is_sphere], rod_ends[is_rod].reshape(-1, 3)))
+            radii = np.concatenate((arrays["sphere_radii"][is_sphere], np.repeat(rod_radii[is_rod], 2)))
+            if len(centers):
+                self._add_glyphs(unit_sphere, centers, radii, color)
+            if is_rod.any():
+                self._add_glyphs(unit_cylinder, midpoints[is_rod], scales[is_rod], color, directions=axes[is_rod])
         enclosing = pv.Sphere(center=(0, 0, 0), radius=cloud.cloud_radius)
-        self.add_mesh(enclosing, color="#786E6D8A", opacity=0.1)
+        self.add_mesh(enclosing, color=CLOUD_COLOR, opacity=0.1)
         self.reset_camera()
 
+    def _add_glyphs(self, source, centers, scales, color, directions=None):
+        """
+        Add one GPU‑instanced actor drawing ``source`` at every center.
+
+        Parameters
+        ----------
+        source : pyvista.PolyData
+            Template mesh centered at the origin.
+        centers : array_like, shape (N, 3)
+            Instance positions.
+        scales : array_like, shape (N,) or (N, 3)
+            Uniform scale factor, or per‑axis factors applied in the
+            template's frame.
+        color : str
+            Actor color.
+        directions : array_like, shape (N, 3), optional
+            Vectors the template's x‑axis is rotated onto.
+        """
+        points = pv.PolyData(np.asarray(centers, dtype=float).reshape(-1, 3))
+        scales = np.asarray(scales, dtype=float)
+        points["scale"] = scales
+        mapper = vtkGlyph3DMapper()
+        mapper.SetInputData(points)
+        mapper.SetSourceData(source)
+        mapper.SetScaleArray("scale")
+        if scales.ndim == 1:
+            mapper.SetScaleModeToScaleByMagnitude()
+        else:
+            mapper.SetScaleModeToScaleByVectorComponents()
+        if directions is not None:
+            points["direction"] = np.asarray(directions, dtype=float)
+            mapper.SetOrientationArray("direction")
+            mapper.SetOrientationModeToDirection()
+        actor = vtkActor()
+        actor.SetMapper(mapper)
+        actor.GetProperty().SetColor(pv.Color(color).float_rgb)
+        self.add_actor(actor)
+
 
 class EnsembleListWindow(QWidget):
     """
@@ -92,7 +247,7 @@ class EnsembleListWindow(QWidget):
     Uses a ``QSqlTableModel`` bound to the ``ensembles`` table and sorts
     by creation timestamp descending. Double‑clicking a row launches a
     :class:`ParticleListWindow` for that ensemble. The model is re‑queried
-    each time the window is shown to keep the view current.
+    when the window is shown after the database has changed.
     """
     def __init__(self):
         super().__init__()
@@ -107,15 +262,21 @@ class EnsembleListWindow(QWidget):
         if not self.db.open():
             raise RuntimeError(self.db.lastError().text())
 
-        # 2) model for `ensembles` table
+        # 2) model for `ensembles` table, sorted before the single select;
+        # SQLite reports no result size, so Qt fetches the rows in batches
+        # of 256 as the view scrolls instead of all of them up front
         self.model = QSqlTableModel(self, self.db)
         self.model.setTable("ensembles")
+        self.model.setSort(10, Qt.DescendingOrder)
         self.model.select()
         self.model.setHeaderData(0, Qt.Horizontal, "ID")
         self.model.setHeaderData(1, Qt.Horizontal, "Type")
         self.model.setHeaderData(2, Qt.Horizontal, "Dipole Size")
-        self.model.setSort(10, Qt.DescendingOrder)
-        self.model.select()
+        self._last_version = self._data_version()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(250)
+        self._refresh_timer.timeout.connect(self._refresh)
 
         # 3) view
         view = QTableView()
@@ -143,20 +304,49 @@ class EnsembleListWindow(QWidget):
         # open a new detail window
         detail_win = ParticleListWindow(self.db, ensemble_id)
         self._detail_windows.append(detail_win)  # keep reference
+        # dropped again once Qt deletes the closed window
+        detail_win.destroyed.connect(lambda _=None, w=detail_win: self._detail_windows.remove(w))
         detail_win.show()
 
     def showEvent(self, event):
         """
-        Re‑select the underlying model whenever the widget becomes visible.
+        Re‑select the underlying model if the database changed while hidden.
 
         Ensures newly created or updated ensembles appear without requiring
-        a manual refresh.
+        a manual refresh, while merely switching back to the tab keeps the
+        loaded rows and the scroll position.
         """
         super().showEvent(event)
-        # every time this widget is shown, re‑query
+        # restarting the timer coalesces bursts of show events into one check
+        self._refresh_timer.start()
+
+    def _refresh(self):
+        """Re‑select the model unless the database is unchanged since the last select."""
+        version = self._data_version()
+        if version != self._last_version:
+            self.model.select()
+            self._last_version = version
+
+    def reload(self):
+        """Re‑select the model unconditionally, e.g. after ``ens_conn`` was re‑opened."""
         self.model.select()
-        # if you have filters, you may also want:
-        
+        self._last_version = self._data_version()
+
+    def _data_version(self):
+        """
+        Return SQLite's ``data_version`` for this connection.
+
+        The value changes whenever another connection commits to the
+        database file, which includes the sqlite3 connection shared by
+        every ``Storer``, so comparing it costs one pragma instead of
+        re‑reading the table.
+        """
+        query = QSqlQuery(self.db)
+        query.exec_("PRAGMA data_version")
+        version = query.value(0) if query.next() else None
+        query.finish()
+        return version
+
 
 class ParticleListWindow(QWidget):
     """
@@ -183,11 +373,17 @@ class ParticleListWindow(QWidget):
         col1 = QVBoxLayout()
         col1.addWidget(QLabel(f"<b>Ensemble ID:</b> {ensemble_id}"))
 
-        # model filtered to this ensemble_id
-        self.model = QSqlTableModel(self, db)
-        self.model.setTable("ensemble_particles")
-        self.model.setFilter(f"ensemble_id = '{ensemble_id}'")
-        self.model.select()
+        # read-only model over a prepared query with the id bound, rather
+        # than a filter string spliced into the SQL; the (ensemble_id,
+        # particle_idx) primary key serves the lookup and the ordering
+        query = QSqlQuery(db)
+        query.prepare(_PARTICLES_QUERY)
+        query.addBindValue(ensemble_id)
+        if not query.exec_():
+            raise RuntimeError(query.lastError().text())
+        # QSqlQueryModel pulls further rows only when the view scrolls to them
+        self.model = QSqlQueryModel(self)
+        self.model.setQuery(query)
         self.model.setHeaderData(1, Qt.Horizontal, "Particle Index")
 
         # view
@@ -206,21 +402,23 @@ class ParticleListWindow(QWidget):
 
         col2 = QVBoxLayout()
         col2.addWidget(QLabel("<b>Visualization:</b>"))
-        view = EnsembleView()
-        view.add_bodies(ensemble_id)
-        col2.addWidget(view)
+        # read once; the same bodies are drawn here and reused by
+        # run_selected_options
+        self.ensemble = CloudGenerator().read_cloud(ensemble_id)
+        self.scene = EnsembleView()
+        self.scene.add_bodies(self.ensemble)
+        col2.addWidget(self.scene)
         
-        conn = sqlite3.connect("ensembles.db")
-        # 2) (Optional) so you can access columns by name
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT ensemble_data, ddscat_run, postprocessing_run FROM ensembles WHERE ensemble_id = ?", (ensemble_id,))
-        row = c.fetchone()
-        conn.close()
-        if row:
-            ensemble_data = row["ensemble_data"]
-            ddscat_run = row["ddscat_run"]
-            postprocessing_run = row["postprocessing_run"]
+        # flags come through the connection this window already shares
+        query = QSqlQuery(db)
+        query.prepare("SELECT ensemble_data, ddscat_run, postprocessing_run FROM ensembles WHERE ensemble_id = ?")
+        query.addBindValue(ensemble_id)
+        if not query.exec_():
+            raise RuntimeError(query.lastError().text())
+        ensemble_data = ddscat_run = postprocessing_run = 0
+        if query.next():
+            ensemble_data, ddscat_run, postprocessing_run = (query.value(i) for i in range(3))
+        query.finish()
         options = []
         if not ensemble_data:
             options.append("Ensemble data")
@@ -240,6 +438,14 @@ class ParticleListWindow(QWidget):
         run_button.clicked.connect(lambda: self.run_selected_options(option_list, ensemble_id))
         row2.addWidget(run_button), col2.addLayout(row2), layout.addLayout(col2)
 
+        # steps still running in the background, and the connection their
+        # completion flags are written through while any are
+        self.option_list = option_list
+        self.run_button = run_button
+        self._running = 0
+        self._workers = []
+        self._storer = None
+
     def make_dropdown(self, options):
         """
         Build a multi‑select dropdown menu.
@@ -304,10 +510,14 @@ class ParticleListWindow(QWidget):
     
     def run_selected_options(self, tag_list, ensemble_id):
         """
-        Execute all user‑selected calculations for the ensemble.
+        Start all user‑selected calculations for the ensemble.
 
-        For each selected task the corresponding runner/executer method is
-        invoked and the database flag updated via :class:`Storer`.
+        Ensemble data is computed on the global ``QThreadPool`` and the
+        DDSCAT / ddpostprocess binaries run as ``QProcess`` children, so the
+        window stays responsive; postprocessing waits for a selected DDA
+        run. Each step's flag is written with :meth:`Storer.mark_done` as
+        soon as it finishes and the step is dropped from ``tag_list``; the
+        run button is disabled until all are done.
 
         Parameters
         ----------
@@ -320,24 +530,94 @@ class ParticleListWindow(QWidget):
         if not selected:
             print("No options selected")
             return
-        
-        # Here you would implement the logic to run the selected options
-        # For now, we just print them
+
         print(f"Running: {', '.join(selected)} for ensemble {ensemble_id}")
-        ensemble = CloudGenerator().read_cloud(ensemble_id)
-        storer = Storer()
-        runner = Runner(ensemble)
-        executer = Executer(ensemble)
-            
-        # Example: if "Ensemble data" is selected, you might call a function to process it
+        ensemble = self.ensemble
+        if self._storer is None:
+            self._storer = Storer()
+        self.run_button.setEnabled(False)
+
         if "Ensemble data" in selected:
-            runner.generate_ensemble_data()
-            storer.update_ensembe_info(ensemble.ensemble_id, "ensemble_data")
+            # the flag is written with the others in _step_ended, so the
+            # pool thread never touches the database
+            runner = Runner(ensemble, self._storer)
+            os.makedirs(runner.target, exist_ok=True)
+            worker = _RunWorker(partial(runner.generate_ensemble_data, flag=False), "Ensemble data")
+            worker.signals.done.connect(self._step_done)
+            worker.signals.failed.connect(self._step_failed)
+            self._workers.append(worker)
+            self._running += 1
+            QThreadPool.globalInstance().start(worker)
 
+        executer = Executer(ensemble)
         if "DDA" in selected:
-            executer.run_ddscat()
-            storer.update_ensembe_info(ensemble.ensemble_id, "ddscat_run")
+            self._start_process(executer, "DDA", then_post="Postprocessing" in selected)
+        elif "Postprocessing" in selected:
+            self._start_process(executer, "Postprocessing")
 
-        if "Postprocessing" in selected:
-            executer.run_ddpostprocess()
-            storer.update_ensembe_info(ensemble.ensemble_id, "postprocessing_run")
\ No newline at end of file
+    def _start_process(self, executer, label, then_post=False):
+        """
+        Write the input files of a solver step and start it with ``QProcess``.
+
+        Parameters
+        ----------
+        executer : Executer
+            Executer of this window's ensemble.
+        label : {'DDA', 'Postprocessing'}
+            Step to run.
+        then_post : bool, default=False
+            Start postprocessing once a successful DDA run exits.
+        """
+        command = executer.ddscat_command() if label == "DDA" else executer.ddpostprocess_command()
+        self._running += 1
+        start_solver(self, command, lambda error: self._process_finished(executer, label, then_post, error))
+
+    def _process_finished(self, executer, label, then_post, error):
+        """Record a solver run (``error`` is ``None`` on success) and chain postprocessing after DDA."""
+        if error is not None:
+            self._step_failed(label, error)
+            return
+        if then_post:
+            self._start_process(executer, "Postprocessing")
+        self._step_done(label)
+
+    def _step_done(self, label):
+        """Write the flag of a completed step and remove it from the option list."""
+        try:
+            self._storer.mark_done(self.ensemble.ensemble_id, _OPTION_FLAGS[label])
+        except sqlite3.Error as e:
+            self._step_failed(label, f"could not record the result: {e}")
+            return
+        for item in self.option_list.findItems(label, Qt.MatchExactly):
+            self.option_list.takeItem(self.option_list.row(item))
+        self._step_ended()
+
+    def _step_failed(self, label, message):
+        """Report a failed step; it stays selectable for another run."""
+        QMessageBox.warning(self, "Step failed", f"{label} failed for ensemble {self.ensemble.ensemble_id}:\n{message}")
+        self._step_ended()
+
+    def _step_ended(self):
+        """Release the database and the run button once nothing is left."""
+        self._running -= 1
+        if self._running:
+            return
+        self._workers = []
+        self._storer.close()
+        self._storer = None
+        self.run_button.setEnabled(True)
+        if not self.isVisible():
+            # closed while running; see closeEvent
+            self.deleteLater()
+
+    def closeEvent(self, event):
+        """
+        Release the render window and delete the closed window.
+
+        While steps are still running the window is only hidden, since its
+        solver processes are its children; :meth:`_step_ended` deletes it
+        after the last one.
+        """
+        self.scene.close()
+        self.setAttribute(Qt.WA_DeleteOnClose, not self._running)
+        super().closeEvent(event)